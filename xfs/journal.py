@@ -1,15 +1,19 @@
 from lib.xfs import *
 from argparse import ArgumentParser
+import multiprocessing
 
 def main():
 
+	multiprocessing.freeze_support()
 	parser = ArgumentParser()
 	parser.add_argument("-i", "--input", help="specify disk image", required=True)
 	parser.add_argument("-o", "--output", help="specify output file", required=True)
 	parser.add_argument("-t", "--trans", help="show transaction ids", required=False, action='store_true')
+	parser.add_argument("-g", "--group", help="group rows by transaction, written out when it commits", required=False, action='store_true')
+	parser.add_argument("-j", "--jobs", help="specify number of worker processes (default: 1)", type=int, default=1)
 	args = parser.parse_args()
 
-	xfs = XFS(args)
+	xfs = XFS(args.input, args.output, trans = args.trans, jobs = args.jobs, group_trans = args.group)
 	xfs.search_logs()
 
 if __name__ == '__main__':
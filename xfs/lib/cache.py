@@ -0,0 +1,124 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import threading
+from .scheduler import *
+
+DEFAULT_CACHE_SIZE = 64 * 1024 * 1024
+
+class BlockCache:
+
+	def _put_block(self, blkno, blk):
+
+		if blkno in self._blocks:
+			self._blocks.move_to_end(blkno)
+			self.hits += 1
+			return
+		self.misses += 1
+		if self.capacity == 0:
+			return
+		self._blocks[blkno] = blk
+		while len(self._blocks) > self.capacity:
+			self._blocks.popitem(last = False)
+			self.evictions += 1
+
+	def _get_block(self, blkno):
+
+		with self._lock:
+			_blk = self._blocks.get(blkno)
+			if _blk != None:
+				self._blocks.move_to_end(blkno)
+				self.hits += 1
+				return _blk
+
+		_blk = self.image.read(blkno * self.block_size, self.block_size)
+		with self._lock:
+			self.reads += 1
+			self._put_block(blkno, _blk)
+		return _blk
+
+	def read(self, offset, size):
+
+		if (offset < 0) or (size <= 0) or (offset >= self.image.size):
+			return b""
+		_bs = self.block_size
+		_first = offset // _bs
+		_last = (offset + size - 1) // _bs
+		_o_in_block = offset - _first * _bs
+		if _first == _last:
+			return self._get_block(_first)[_o_in_block:_o_in_block + size]
+
+		with self._lock:
+			_missing = any(_b not in self._blocks for _b in range(_first, _last + 1))
+		if _missing:
+			return self._fill(_first, _last)[_o_in_block:_o_in_block + size]
+		_r = []
+		for _b in range(_first, _last + 1):
+			_r.append(self._get_block(_b))
+		return b"".join(_r)[_o_in_block:_o_in_block + size]
+
+	def _fill(self, first, last):
+
+		_bs = self.block_size
+		_buf = self.image.read(first * _bs, (last - first + 1) * _bs)
+		with self._lock:
+			self.reads += 1
+			for _b in range(first, last + 1):
+				_o = (_b - first) * _bs
+				if _o >= len(_buf):
+					break
+				self._put_block(_b, _buf[_o:_o + _bs])
+		return _buf
+
+	def load(self, ranges):
+
+		if self.capacity == 0:
+			return
+		_bs = self.block_size
+		_scheduler = ReadScheduler(self.image.read, self.read_gap, pool = self._pool)
+		with self._lock:
+			for _offset, _size in ranges:
+				if (_offset < 0) or (_size <= 0) or (_offset >= self.image.size):
+					continue
+				_first = _offset // _bs
+				_last = (_offset + _size - 1) // _bs
+				if any(_b not in self._blocks for _b in range(_first, _last + 1)):
+					_scheduler.submit(_first * _bs, (_last - _first + 1) * _bs)
+		_scheduler.run()
+
+		with self._lock:
+			self.reads += _scheduler.reads
+			for _offset, _buf in _scheduler.buffers:
+				_first = _offset // _bs
+				for _b in range(_first, _first + (len(_buf) + _bs - 1) // _bs):
+					_o = (_b - _first) * _bs
+					self._put_block(_b, _buf[_o:_o + _bs])
+
+	def stats(self):
+		return "cache: blocks %d/%d, hits %d, misses %d, evictions %d, reads %d" \
+				% (len(self._blocks), self.capacity, self.hits, self.misses, self.evictions, self.reads)
+
+	def clear(self):
+		with self._lock:
+			self._blocks.clear()
+
+	def close(self):
+
+		if self._pool != None:
+			self._pool.shutdown()
+			self._pool = None
+
+	def __init__(self, image, block_size, cache_size, io_threads = 1, read_gap = DEFAULT_READ_GAP):
+
+		self.image = image
+		self.block_size = block_size
+		self.capacity = cache_size // block_size
+		self.hits = 0
+		self.misses = 0
+		self.evictions = 0
+		self.reads = 0
+		self.read_gap = read_gap
+		self._blocks = OrderedDict()
+		self._lock = threading.Lock()
+		self._pool = None
+		if io_threads > 1:
+			self._pool = ThreadPoolExecutor(max_workers = io_threads)
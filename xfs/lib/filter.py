@@ -0,0 +1,70 @@
+from .misc import *
+
+def join_path(parent_path, name):
+
+	if parent_path == "":
+		return name
+	if parent_path == "/":
+		return parent_path + name
+	return parent_path + "/" + name
+
+class InodeFilter:
+
+	def match_path(self, path):
+
+		if self.path_prefix == None:
+			return True
+		return (path == self.path_prefix) or path.startswith(self._path_prefix_dir)
+
+	def may_contain(self, dir_path):
+
+		if self.path_prefix == None:
+			return True
+		return self.match_path(dir_path) or self._path_prefix_dir.startswith(dir_path + "/") \
+			or (dir_path == "/")
+
+	def _match_time(self, raw, bigtime, time_range):
+
+		if time_range == None:
+			return True
+		if raw == None:
+			return False
+		_epoch = raw_timestamp_to_epoch(raw, bigtime)
+		if (time_range[0] != None) and (_epoch < time_range[0]):
+			return False
+		if (time_range[1] != None) and (_epoch >= time_range[1]):
+			return False
+		return True
+
+	def match(self, inode_rec):
+
+		if not self.match_path(join_path(inode_rec.parent_path, inode_rec.name)):
+			return False
+		if not self.needs_core:
+			return True
+		if not inode_rec.has_core:
+			return False
+		if (self.ftypes != None) and (conv_type_to_str(get_type(inode_rec.mode)) not in self.ftypes):
+			return False
+		if (self.uids != None) and (inode_rec.uid not in self.uids):
+			return False
+		if not self._match_time(inode_rec.mtime, inode_rec.bigtime, self.mtime_range):
+			return False
+		if not self._match_time(inode_rec.ctime, inode_rec.bigtime, self.ctime_range):
+			return False
+		return True
+
+	def __init__(self, path_prefix = None, ftypes = None, uids = None, mtime_range = None, ctime_range = None):
+
+		if (path_prefix != None) and (path_prefix != "/"):
+			path_prefix = "/" + path_prefix.strip("/")
+		self.path_prefix = path_prefix
+		self._path_prefix_dir = None
+		if path_prefix != None:
+			self._path_prefix_dir = path_prefix.rstrip("/") + "/"
+		self.ftypes = ftypes
+		self.uids = uids
+		self.mtime_range = mtime_range
+		self.ctime_range = ctime_range
+		self.needs_core = (ftypes != None) or (uids != None) \
+			or (mtime_range != None) or (ctime_range != None)
@@ -0,0 +1,73 @@
+from .misc import *
+
+class Geometry:
+
+	__slots__ = ("agcount", "blocksize", "blocklog", "sectsize", "inodesize", "inopblock", \
+				"inopblog", "agblocks", "agblklog", "agblk_mask", "agino_log", "agino_mask", \
+				"inopblock_mask", "ag_bytes", "is_v5", "rootino", "blkbb_log", \
+				"log_bb_size", "log_bb_start", "blocks_per_cluster", "inode_cluster_size", \
+				"dirblksize")
+
+	def ino_to_agno(self, ino):
+		return ino >> self.agino_log
+
+	def ino_to_offset(self, ino):
+
+		_ag_no = ino >> self.agino_log
+		if _ag_no >= self.agcount:
+			return None
+		_rel_inode = ino & self.agino_mask
+		return _ag_no * self.ag_bytes \
+			+ (_rel_inode >> self.inopblog) * self.blocksize \
+			+ (_rel_inode & self.inopblock_mask) * self.inodesize
+
+	def ino_to_cluster_offset(self, ino):
+
+		_ag_no = ino >> self.agino_log
+		if _ag_no >= self.agcount:
+			return None
+		_agbno = (ino & self.agino_mask) >> self.inopblog
+		_agbno -= _agbno % self.blocks_per_cluster
+		return (_ag_no * self.agblocks + _agbno) * self.blocksize
+
+	def fsb_to_offset(self, fsb):
+		return ((fsb >> self.agblklog) * self.agblocks + (fsb & self.agblk_mask)) * self.blocksize
+
+	def agb_to_ino(self, ag_no, agbno, isize):
+		return (ag_no << self.agino_log) + (agbno << self.inopblog) + isize // self.inodesize
+
+	def __setattr__(self, name, value):
+		raise AttributeError("Geometry is immutable")
+
+	def __init__(self, sb, agcount):
+
+		_set = object.__setattr__
+		_set(self, "agcount", agcount)
+		_set(self, "blocksize", sb.sb_blocksize)
+		_set(self, "blocklog", sb.sb_blocklog)
+		_set(self, "sectsize", sb.sb_sectsize)
+		_set(self, "inodesize", sb.sb_inodesize)
+		_set(self, "inopblock", sb.sb_inopblock)
+		_set(self, "inopblog", sb.sb_inopblog)
+		_set(self, "agblocks", sb.sb_agblocks)
+		_set(self, "agblklog", sb.sb_agblklog)
+		_set(self, "agblk_mask", (1 << sb.sb_agblklog) - 1)
+		_set(self, "agino_log", sb.sb_agblklog + sb.sb_inopblog)
+		_set(self, "agino_mask", (1 << (sb.sb_agblklog + sb.sb_inopblog)) - 1)
+		_set(self, "inopblock_mask", (1 << sb.sb_inopblog) - 1)
+		_set(self, "ag_bytes", sb.sb_agblocks * sb.sb_blocksize)
+		_set(self, "is_v5", XFS_SB_VERSION_NUM(sb.sb_versionnum) == XFS_SB_VERSION_5)
+		_set(self, "rootino", sb.sb_rootino)
+		_set(self, "dirblksize", sb.sb_blocksize << sb.sb_dirblklog)
+		_cluster_size = XFS_INODE_BIG_CLUSTER_SIZE
+		if XFS_SB_VERSION_NUM(sb.sb_versionnum) == XFS_SB_VERSION_5:
+			_new_size = _cluster_size * (sb.sb_inodesize // XFS_DINODE_MIN_SIZE)
+			if sb.sb_inoalignmt >= (_new_size >> sb.sb_blocklog):
+				_cluster_size = _new_size
+		_blocks_per_cluster = max(1, _cluster_size >> sb.sb_blocklog)
+		_set(self, "blocks_per_cluster", _blocks_per_cluster)
+		_set(self, "inode_cluster_size", _blocks_per_cluster * sb.sb_blocksize)
+		_blkbb_log = sb.sb_blocklog - BBSHIFT
+		_set(self, "blkbb_log", _blkbb_log)
+		_set(self, "log_bb_size", XFS_FSB_TO_BB(sb.sb_logblocks, _blkbb_log))
+		_set(self, "log_bb_start", XFS_FSB_TO_DADDR(sb.sb_logstart, sb.sb_agblocks, sb.sb_agblklog, _blkbb_log))
@@ -0,0 +1,68 @@
+import mmap
+import os
+import threading
+
+class Image:
+
+	def read(self, offset, size):
+
+		if (offset < 0) or (size <= 0) or (offset >= self.size):
+			return b""
+		if self._mm != None:
+			return self._mm[offset:offset + size]
+		if hasattr(os, "pread"):
+			return os.pread(self._fd.fileno(), min(size, self.size - offset), offset)
+		with self._lock:
+			self._fd.seek(offset)
+			return self._fd.read(size)
+
+	def readinto(self, offset, buf):
+
+		if (offset < 0) or (offset >= self.size):
+			return 0
+		_n = min(len(buf), self.size - offset)
+		if self._mm != None:
+			memoryview(buf)[:_n] = memoryview(self._mm)[offset:offset + _n]
+			return _n
+		if hasattr(os, "preadv"):
+			return os.preadv(self._fd.fileno(), [memoryview(buf)[:_n]], offset)
+		with self._lock:
+			self._fd.seek(offset)
+			return self._fd.readinto(memoryview(buf)[:_n])
+
+	def view(self, offset, size):
+
+		if (offset < 0) or (size <= 0) or (offset >= self.size):
+			return memoryview(b"")
+		if self._mm != None:
+			return memoryview(self._mm)[offset:offset + size]
+		_buf = bytearray(min(size, self.size - offset))
+		return memoryview(_buf)[:self.readinto(offset, _buf)]
+
+	def close(self):
+
+		if self._mm != None:
+			self._mm.close()
+			self._mm = None
+		if self._fd != None:
+			self._fd.close()
+			self._fd = None
+
+	def __del__(self):
+		self.close()
+
+	def __init__(self, path, use_mmap = True):
+
+		self._mm = None
+		self._fd = None
+		self._lock = threading.Lock()
+		self._fd = open(path, "rb")
+		self._fd.seek(0, os.SEEK_END)
+		self.size = self._fd.tell()
+		self._fd.seek(0)
+		if not use_mmap:
+			return
+		try:
+			self._mm = mmap.mmap(self._fd.fileno(), self.size, access=mmap.ACCESS_READ)
+		except (ValueError, OSError, OverflowError):
+			self._mm = None
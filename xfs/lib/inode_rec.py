@@ -1,11 +1,43 @@
+from .misc import *
+
 class InodeRec:
 
+	__slots__ = ("inode_num", "name", "parent_inode_num", "parent_path", "ftype", \
+				"sl_target", "attrs", "is_deleted", "has_core", "version", "mode", \
+				"uid", "gid", "size", "bigtime", "atime", "mtime", "ctime", "crtime")
+
+	def set_inode_core(self, inode_core):
+
+		self.has_core = True
+		self.version = inode_core.di_version
+		self.mode = inode_core.di_mode
+		self.uid = inode_core.di_uid
+		self.gid = inode_core.di_gid
+		self.size = inode_core.di_size
+		self.bigtime = bool(xfs_dinode_has_bigtime(inode_core.di_version, inode_core.di_flags2))
+		self.atime = timestamp_to_raw(inode_core.di_atime)
+		self.mtime = timestamp_to_raw(inode_core.di_mtime)
+		self.ctime = timestamp_to_raw(inode_core.di_ctime)
+		if inode_core.di_version == 0x03:
+			self.crtime = timestamp_to_raw(inode_core.di_crtime)
+
 	def __init__(self):
 		self.inode_num = 0
 		self.name = ""
 		self.parent_inode_num = 0
 		self.parent_path = ""
-		self.inode_core = None
+		self.ftype = ""
 		self.sl_target = ""
 		self.attrs = []
 		self.is_deleted = False
+		self.has_core = False
+		self.version = 0
+		self.mode = -1
+		self.uid = -1
+		self.gid = -1
+		self.size = -1
+		self.bigtime = False
+		self.atime = None
+		self.mtime = None
+		self.ctime = None
+		self.crtime = None
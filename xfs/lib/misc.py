@@ -6,6 +6,7 @@ from ctypes import *
 from enum import IntEnum, Enum
 import sys
 import datetime
+import time
 
 XFSLABEL_MAX = 12
 
@@ -185,6 +186,11 @@ XFS_DA_NODE_MAXDEPTH = 5
 
 XFS_MAXINUMBER = ((1 << 56) - 1)
 XFS_MAXINUMBER_32 = ((1 << 32) - 1)
+XFS_INODES_PER_CHUNK = 64
+XFS_INODE_BIG_CLUSTER_SIZE = 8192
+XFS_DINODE_MIN_LOG = 8
+XFS_DINODE_MIN_SIZE = (1 << XFS_DINODE_MIN_LOG)
+XFS_INODES_PER_HOLEMASK_BIT = 4
 
 XFS_SB_VERSION_1 = 1
 XFS_SB_VERSION_2 = 2
@@ -242,6 +248,12 @@ XFS_DIR2_FREE_MAGIC = 0x58443246
 XFS_DIR3_BLOCK_MAGIC = 0x58444233
 XFS_DIR3_DATA_MAGIC = 0x58444433
 XFS_DIR3_FREE_MAGIC = 0x58444633
+
+XFS_DIR2_LEAF1_MAGIC = 0xd2f1
+XFS_DIR2_LEAFN_MAGIC = 0xd2ff
+XFS_DIR3_LEAF1_MAGIC = 0x3df1
+XFS_DIR3_LEAFN_MAGIC = 0x3dff
+XFS_DIR2_NULL_DATAPTR = 0
 XFS_DIR2_DATA_FD_COUNT = 3
 
 XFS_ATTR_LOCAL_BIT = 0
@@ -408,8 +420,8 @@ BLKBSZSET =  _IOW(0x12, 113, c_size_t)
 BLKGETSIZE64 = _IOR(0x12, 114, c_size_t)
 MAX_DEVS=10
 
-xfs_bmbt_ptr = c_uint64
-xfs_bmdr_ptr = c_uint64
+xfs_bmbt_ptr = c_uint64.__ctype_be__
+xfs_bmdr_ptr = c_uint64.__ctype_be__
 xfs_rtblock = c_uint64
 xfs_agblock = c_uint32
 xfs_agnumber = c_uint32
@@ -468,12 +480,17 @@ class xfs_dinode_fmt(IntEnum):
 	XFS_DINODE_FMT_UUID = 4
 	XFS_DINODE_FMT_RMAP = 5
 
-class xfs_timestamp(Structure):
+class xfs_timestamp(BigEndianStructure):
+	_fields_ = [
+		("t_sec", c_int32),
+		("t_nsec", c_int32)
+	]
+
+class xfs_log_timestamp(Structure):
 	_fields_ = [
 		("t_sec", c_int32),
 		("t_nsec", c_int32)
 	]
-xfs_log_timestamp = xfs_timestamp
 
 class uuid(Structure):
 	_fields_ = [
@@ -533,7 +550,7 @@ class xfs_dir2_sf(Structure):
 		("list", xfs_dir2_sf_entry * 1)
 	]
 
-class xfs_dinode(Structure):
+class xfs_dinode(BigEndianStructure):
 	_fields_ = [
 		("di_magic", c_uint16),
 		("di_mode", c_uint16),
@@ -625,9 +642,9 @@ class xfs_log_dinode(Structure):
 		("di_projid_lo", c_uint16),
 		("di_projid_hi", c_uint16),
 		("di_big_nextents_union", xfs_big_nextents_union),
-		("di_atime", xfs_timestamp),
-		("di_mtime", xfs_timestamp),
-		("di_ctime", xfs_timestamp),
+		("di_atime", xfs_log_timestamp),
+		("di_mtime", xfs_log_timestamp),
+		("di_ctime", xfs_log_timestamp),
 		("di_size", xfs_fsize),
 		("di_nblocks", xfs_rfsblock),
 		("di_extsize", xfs_extlen),
@@ -645,18 +662,18 @@ class xfs_log_dinode(Structure):
 		("di_flags2", c_uint64),
 		("di_cowextsize", c_uint32),
 		("di_pad2", c_uint8 * 12),
-		("di_crtime", xfs_timestamp),
+		("di_crtime", xfs_log_timestamp),
 		("di_ino", xfs_ino),
 		("di_uuid", uuid)
 	]
 
-class xfs_bmbt_key(Structure):
+class xfs_bmbt_key(BigEndianStructure):
 	_fields_= [
 		("br_startoff", c_uint64)
 	]
 xfs_bmdr_key = xfs_bmbt_key
 
-class xfs_bmbt_rec_32(Structure):
+class xfs_bmbt_rec_32(BigEndianStructure):
 	_fields_ = [
 		("l0", c_uint32),
 		("l1", c_uint32),
@@ -664,7 +681,7 @@ class xfs_bmbt_rec_32(Structure):
 		("l3", c_uint32),
 	]
 
-class xfs_bmbt_rec_64(Structure):
+class xfs_bmbt_rec_64(BigEndianStructure):
 	_fields_ = [
 		("l0", c_uint64),
 		("l1", c_uint64)
@@ -680,13 +697,13 @@ class xfs_bmbt_irec(Structure):
 		("br_state", c_int32)
 	]
 
-class xfs_alloc_rec(Structure):
+class xfs_alloc_rec(BigEndianStructure):
 	_fields_ = [
 		("ar_statblock", c_uint64),
 		("ar_blockcount", c_uint64)
 	]
 
-class xfs_agi(Structure):
+class xfs_agi(BigEndianStructure):
 	_fields_ = [
 		("agi_magicnum", c_uint32),
 		("agi_versionnum", c_uint32),
@@ -709,7 +726,7 @@ class xfs_agi(Structure):
 		("agi_fblocks", c_uint32)
 	]
 
-class xfs_agf(Structure):
+class xfs_agf(BigEndianStructure):
 	_fields_ = [
 		("agf_magicnum", c_uint32),
 		("agf_versionnum", c_uint32),
@@ -738,7 +755,7 @@ class xfs_agf(Structure):
 		("", c_uint32),
 	]
 
-class xfs_disk_dquot(Structure):
+class xfs_disk_dquot(BigEndianStructure):
 	_fields_ = [
 		("d_magic", c_uint16),
 		("d_version", c_uint8),
@@ -763,7 +780,7 @@ class xfs_disk_dquot(Structure):
 		("d_pad", c_uint16)
 	]
 
-class xfs_sb(Structure):
+class xfs_sb(BigEndianStructure):
 	_fields_ = [
 		("sb_magicnum", c_uint32),
 		("sb_blocksize", c_uint32),
@@ -827,7 +844,7 @@ class xfs_sb(Structure):
 		("sb_pad", c_uint8 * 7)
 	]
 
-class xfs_dsb(Structure):
+class xfs_dsb(BigEndianStructure):
 	_fields_ = [
 		("sb_magicnum", c_uint32),
 		("sb_blocksize", c_uint32),
@@ -891,13 +908,13 @@ class xfs_dsb(Structure):
 		("sb_pad", c_uint8 * 7)
 	]
 
-class xfs_bmdr_block(Structure):
+class xfs_bmdr_block(BigEndianStructure):
 	_fields_ = [
 		("bb_level", c_uint16),
 		("bb_numrecs", c_uint16)
 	]
 
-class xfs_btree_lblock(Structure):
+class xfs_btree_lblock(BigEndianStructure):
 	_fields_ = [
 		("bb_magic", c_uint32),
 		("bb_level", c_uint16),
@@ -913,12 +930,43 @@ class xfs_btree_lblock(Structure):
 	]
 xfs_bmbt_block = xfs_btree_lblock
 
-class xfs_dir2_leaf_tail(Structure):
+class xfs_btree_sblock(BigEndianStructure):
+	_fields_ = [
+		("bb_magic", c_uint32),
+		("bb_level", c_uint16),
+		("bb_numrecs", c_uint16),
+		("bb_leftsib", c_uint32),
+		("bb_rightsib", c_uint32),
+		("bb_blkno", c_uint64),
+		("bb_lsn", c_uint64),
+		("bb_uuid", uuid),
+		("bb_owner", c_uint32),
+		("bb_crc", c_uint32)
+	]
+	def size(self):
+		if self.bb_magic == XFS_IBT_CRC_MAGIC or self.bb_magic == XFS_FIBT_CRC_MAGIC:
+			return sizeof(xfs_btree_sblock)
+		else:
+			return xfs_btree_sblock.bb_blkno.offset
+xfs_inobt_block = xfs_btree_sblock
+
+class xfs_inobt_rec(BigEndianStructure):
+	_fields_ = [
+		("ir_startino", c_uint32),
+		("ir_holemask", c_uint16),
+		("ir_count", c_uint8),
+		("ir_freecount", c_uint8),
+		("ir_free", c_uint64)
+	]
+xfs_inobt_key = c_uint32.__ctype_be__
+xfs_inobt_ptr = c_uint32.__ctype_be__
+
+class xfs_dir2_leaf_tail(BigEndianStructure):
 	_fields_ = [
 		("bestcount", c_uint32)
 	]
 
-class xfs_da_blkinfo(Structure):
+class xfs_da_blkinfo(BigEndianStructure):
 	_fields_ = [
 		("forw", c_uint32),
 		("back", c_uint32),
@@ -926,20 +974,20 @@ class xfs_da_blkinfo(Structure):
 		("pad", c_uint16)
 	]
 
-class xfs_dir2_leaf_entry(Structure):
+class xfs_dir2_leaf_entry(BigEndianStructure):
 	_fields_ = [
 		("hashval", c_uint32),
 		("address", c_uint32)
 	]
 
-class xfs_dir2_leaf_hdr(Structure):
+class xfs_dir2_leaf_hdr(BigEndianStructure):
 	_fields_ = [
 		("info", xfs_da_blkinfo),
 		("count", c_uint16),
 		("stale", c_uint16)
 	]
 
-class xfs_da3_blkinfo(Structure):
+class xfs_da3_blkinfo(BigEndianStructure):
 	_fields_ = [
 		("hdr", xfs_da_blkinfo),
 		("crc", c_uint32),
@@ -949,7 +997,7 @@ class xfs_da3_blkinfo(Structure):
 		("owner", c_uint64),
 	]
 
-class xfs_dir3_leaf_hdr(Structure):
+class xfs_dir3_leaf_hdr(BigEndianStructure):
 	_fields_ = [
 		("info", xfs_da3_blkinfo),
 		("count", c_uint16),
@@ -957,33 +1005,33 @@ class xfs_dir3_leaf_hdr(Structure):
 		("pad", c_uint32)
 	]
 
-class xfs_dir2_data_free(Structure):
+class xfs_dir2_data_free(BigEndianStructure):
 	_fields_ = [
 		("offset", c_uint16),
 		("length", c_uint16)
 	]
 
-class xfs_dir2_data_entry(Structure):
+class xfs_dir2_data_entry(BigEndianStructure):
 	_fields_ = [
 		("inumber", c_uint64),
 		("namelen", c_uint8),
 		("name", c_uint8 * 1)
 	]
 
-class xfs_dir2_data_unused(Structure):
+class xfs_dir2_data_unused(BigEndianStructure):
 	_fields_ = [
 		("freetag", c_uint16),
 		("length", c_uint16),
 		("tag", c_uint16)
 	]
 
-class xfs_dir2_block_tail(Structure):
+class xfs_dir2_block_tail(BigEndianStructure):
 	_fields_ = [
 		("count", c_uint32),
 		("stale", c_uint32)
 	]
 
-class xfs_dir2_data_hdr(Structure):
+class xfs_dir2_data_hdr(BigEndianStructure):
 	_fields_ = [
 		("magic", c_uint32),
 		("bestfree", xfs_dir2_data_free * XFS_DIR2_DATA_FD_COUNT)
@@ -1001,7 +1049,7 @@ class xfs_dir2_data(Structure):
 		("u", xfs_dir2_data_union * 1)
 	]
 
-class xfs_dir3_blk_hdr(Structure):
+class xfs_dir3_blk_hdr(BigEndianStructure):
 	_fields_ = [
 		("magic", c_uint32),
 		("crc", c_uint32),
@@ -1011,7 +1059,7 @@ class xfs_dir3_blk_hdr(Structure):
 		("owner", c_uint64)
 	]
 
-class xfs_dir3_data_hdr(Structure):
+class xfs_dir3_data_hdr(BigEndianStructure):
 	_fields_ = [
 		("hdr", xfs_dir3_blk_hdr),
 		("best_free", xfs_dir2_data_free * XFS_DIR2_DATA_FD_COUNT),
@@ -1026,7 +1074,7 @@ class xfs_dir2_block(Structure):
 		("tail", xfs_dir2_block_tail)
 	]
 
-class xfs_attr_sf_hdr(Structure):
+class xfs_attr_sf_hdr(BigEndianStructure):
 	_fields_ = [
 		("totsize", c_uint16),
 		("count", c_uint8),
@@ -1041,7 +1089,7 @@ class xfs_attr_sf_entry(Structure):
 		("nameval", c_uint8 * 1)
 	]
 
-class xlog_rec_header(Structure):
+class xlog_rec_header(BigEndianStructure):
 	_fields_ = [
 		("h_magicno", c_uint32),
 		("h_cycle", c_uint32),
@@ -1156,7 +1204,7 @@ class xfs_trans_header(Structure):
 		("th_num_items", c_uint32)
 	]
 
-class xlog_op_header(Structure):
+class xlog_op_header(BigEndianStructure):
 	_fields_ = [
 		("oh_tid", c_uint32),
 		("oh_len", c_uint32),
@@ -1165,14 +1213,7 @@ class xlog_op_header(Structure):
 		("oh_res2", c_uint16)
 	]
 
-class xlog_split_item:
-	def __init__(self):
-		self.si_next = None
-		self.si_prev = None
-		self.si_xtid = 0x0
-		self.si_skip = 0
-
-class xlog_rec_ext_header(Structure):
+class xlog_rec_ext_header(BigEndianStructure):
 	_fields_ = [
 		("xh_cycle", c_uint32),
 		("xh_cycle_data", c_uint32 * (XLOG_HEADER_CYCLE_SIZE // BBSIZE))
@@ -1242,7 +1283,7 @@ def BBTOB(bbs):
 	return (bbs) << BBSHIFT
 
 def XFS_SB_VERSION_NUM(sb_versionnum):
-	return cpu_to_be16(sb_versionnum) & XFS_SB_VERSION_NUMBITS
+	return sb_versionnum & XFS_SB_VERSION_NUMBITS
 
 def XFS_LITINO(sb_inodesize, di_version):
 	return sb_inodesize - xfs_dinode_size(di_version)
@@ -1271,39 +1312,27 @@ def XFS_DFORK_SIZE(di_forkoff, sb_inodesize, di_version, w):
 	else:
 		return XFS_DFORK_ASIZE(di_forkoff, sb_inodesize, di_version)
 
-def New(src, target):
-	_c = cast(src, POINTER(target)).contents
-	return _c
+def New(src, target, offset = 0):
+	_size = sizeof(target)
+	if len(src) < offset + _size:
+		src = bytes(src[offset:offset + _size]).ljust(_size, b"\x00")
+		offset = 0
+	return target.from_buffer_copy(src, offset)
 
 def _to_cpu(val, bytes):
-	_v = 0
 	if sys.byteorder == "little":
-		_val = val.to_bytes(bytes, byteorder=sys.byteorder)
-		for i in range(len(_val)):
-			_v = _v + (_val[len(_val)-1-i] << 8*i)
-	else:
-		_v = val
-	return _v
+		return int.from_bytes(val.to_bytes(bytes, byteorder="little"), byteorder="big")
+	return val
 
 def _cpu_to_be(val, bytes):
-	_v = 0
 	if sys.byteorder == "little":
-		_val = val.to_bytes(bytes,byteorder=sys.byteorder)
-		for i in range(len(_val)):
-			_v = _v + (_val[len(_val)-1-i] << 8*i)
-	else:
-		_v = val
-	return _v
+		return int.from_bytes(val.to_bytes(bytes, byteorder="little"), byteorder="big")
+	return val
 
 def _cpu_to_le(val, bytes):
-	_v = 0
 	if sys.byteorder == "big":
-		_val = val.to_bytes(bytes,byteorder=sys.byteorder)
-		for i in range(len(_val)):
-			_v = _v + (_val[len(_val)-1-i] << 8*i)
-	else:
-		_v = val
-	return _v
+		return int.from_bytes(val.to_bytes(bytes, byteorder="big"), byteorder="little")
+	return val
 
 def be64_to_cpu(val):
 	if val < 0:
@@ -1439,12 +1468,40 @@ def get_unaligned_be32(ptr):
 def get_unaligned_be64(ptr):
 	return get_unaligned_be32(ptr) << 32 | get_unaligned_be32(ptr[4:])
 
-def get_type(mode, is_bigendian = True):
-	if is_bigendian:
-		_m = cpu_to_be16(mode) & S_IFMT
-	else:
-		_m = mode & S_IFMT
-	return _m
+def rol32(x, n):
+	return ((x << n) | (x >> (32 - n))) & 0xffffffff
+
+def xfs_da_hashname(name):
+
+	_hash = 0
+	_i = 0
+	_n = len(name)
+	while _n - _i >= 4:
+		_hash = ((name[_i] << 21) ^ (name[_i + 1] << 14) ^ (name[_i + 2] << 7) \
+				^ name[_i + 3] ^ rol32(_hash, 7 * 4)) & 0xffffffff
+		_i += 4
+	if _n - _i == 3:
+		return ((name[_i] << 14) ^ (name[_i + 1] << 7) ^ name[_i + 2] ^ rol32(_hash, 7 * 3)) & 0xffffffff
+	elif _n - _i == 2:
+		return ((name[_i] << 7) ^ name[_i + 1] ^ rol32(_hash, 7 * 2)) & 0xffffffff
+	elif _n - _i == 1:
+		return (name[_i] ^ rol32(_hash, 7 * 1)) & 0xffffffff
+	return _hash
+
+def xfs_ascii_ci_xfrm(c):
+	if (0x41 <= c <= 0x5a) or ((0xc0 <= c <= 0xde) and (c != 0xd7)):
+		return c + 0x20
+	return c
+
+def xfs_ascii_ci_hashname(name):
+
+	_hash = 0
+	for _c in name:
+		_hash = (xfs_ascii_ci_xfrm(_c) ^ rol32(_hash, 7)) & 0xffffffff
+	return _hash
+
+def get_type(mode):
+	return mode & S_IFMT
 
 def get_uuid(uuid):
 	_uuid = ""
@@ -1458,34 +1515,34 @@ def xfs_sb_is_v5(sb):
 def xfs_sb_version_to_features(sb):
 
 	features = 0 & 0xffffffffffffffff
-	if cpu_to_be64(sb.sb_rblocks) > 0:
+	if sb.sb_rblocks > 0:
 		features |= XFS_FEAT_REALTIME
-	if (cpu_to_be16(sb.sb_versionnum) & XFS_SB_VERSION_NLINKBIT):
+	if (sb.sb_versionnum & XFS_SB_VERSION_NLINKBIT):
 		features |= XFS_FEAT_NLINK
-	if (cpu_to_be16(sb.sb_versionnum) & XFS_SB_VERSION_ATTRBIT):
+	if (sb.sb_versionnum & XFS_SB_VERSION_ATTRBIT):
 		features |= XFS_FEAT_ATTR
-	if (cpu_to_be16(sb.sb_versionnum) & XFS_SB_VERSION_QUOTABIT):
+	if (sb.sb_versionnum & XFS_SB_VERSION_QUOTABIT):
 		features |= XFS_FEAT_QUOTA
-	if (cpu_to_be16(sb.sb_versionnum) & XFS_SB_VERSION_ALIGNBIT):
+	if (sb.sb_versionnum & XFS_SB_VERSION_ALIGNBIT):
 		features |= XFS_FEAT_ALIGN
-	if (cpu_to_be16(sb.sb_versionnum) & XFS_SB_VERSION_LOGV2BIT):
+	if (sb.sb_versionnum & XFS_SB_VERSION_LOGV2BIT):
 		features |= XFS_FEAT_LOGV2
-	if (cpu_to_be16(sb.sb_versionnum) & XFS_SB_VERSION_DALIGNBIT):
+	if (sb.sb_versionnum & XFS_SB_VERSION_DALIGNBIT):
 		features |= XFS_FEAT_DALIGN
-	if (cpu_to_be16(sb.sb_versionnum) & XFS_SB_VERSION_EXTFLGBIT):
+	if (sb.sb_versionnum & XFS_SB_VERSION_EXTFLGBIT):
 		features |= XFS_FEAT_EXTFLG
-	if (cpu_to_be16(sb.sb_versionnum) & XFS_SB_VERSION_SECTORBIT):
+	if (sb.sb_versionnum & XFS_SB_VERSION_SECTORBIT):
 		features |= XFS_FEAT_SECTOR
-	if (cpu_to_be16(sb.sb_versionnum) & XFS_SB_VERSION_BORGBIT):
+	if (sb.sb_versionnum & XFS_SB_VERSION_BORGBIT):
 		features |= XFS_FEAT_ASCIICI
-	if (cpu_to_be16(sb.sb_versionnum) & XFS_SB_VERSION_MOREBITSBIT):
-		if (cpu_to_be32(sb.sb_features2) & XFS_SB_VERSION2_LAZYSBCOUNTBIT):
+	if (sb.sb_versionnum & XFS_SB_VERSION_MOREBITSBIT):
+		if (sb.sb_features2 & XFS_SB_VERSION2_LAZYSBCOUNTBIT):
 			features |= XFS_FEAT_LAZYSBCOUNT
-		if (cpu_to_be32(sb.sb_features2) & XFS_SB_VERSION2_ATTR2BIT):
+		if (sb.sb_features2 & XFS_SB_VERSION2_ATTR2BIT):
 			features |= XFS_FEAT_ATTR2
-		if (cpu_to_be32(sb.sb_features2) & XFS_SB_VERSION2_PROJID32BIT):
+		if (sb.sb_features2 & XFS_SB_VERSION2_PROJID32BIT):
 			features |= XFS_FEAT_PROJID32
-		if (cpu_to_be32(sb.sb_features2) & XFS_SB_VERSION2_FTYPE):
+		if (sb.sb_features2 & XFS_SB_VERSION2_FTYPE):
 			features |= XFS_FEAT_FTYPE
 	if not xfs_sb_is_v5(sb):
 		return features
@@ -1493,25 +1550,25 @@ def xfs_sb_version_to_features(sb):
 	features |= (XFS_FEAT_ALIGN | XFS_FEAT_LOGV2 | XFS_FEAT_EXTFLG | \
 				XFS_FEAT_LAZYSBCOUNT | XFS_FEAT_ATTR2 | XFS_FEAT_PROJID32 | \
 				XFS_FEAT_V3INODES | XFS_FEAT_CRC | XFS_FEAT_PQUOTINO)
-	if (cpu_to_be32(sb.sb_features_ro_compat) & XFS_SB_FEAT_RO_COMPAT_FINOBT):
+	if (sb.sb_features_ro_compat & XFS_SB_FEAT_RO_COMPAT_FINOBT):
 		features |= XFS_FEAT_FINOBT
-	if (cpu_to_be32(sb.sb_features_ro_compat) & XFS_SB_FEAT_RO_COMPAT_RMAPBT):
+	if (sb.sb_features_ro_compat & XFS_SB_FEAT_RO_COMPAT_RMAPBT):
 		features |= XFS_FEAT_RMAPBT
-	if (cpu_to_be32(sb.sb_features_ro_compat) & XFS_SB_FEAT_RO_COMPAT_REFLINK):
+	if (sb.sb_features_ro_compat & XFS_SB_FEAT_RO_COMPAT_REFLINK):
 		features |= XFS_FEAT_REFLINK
-	if (cpu_to_be32(sb.sb_features_ro_compat) & XFS_SB_FEAT_RO_COMPAT_INOBTCNT):
+	if (sb.sb_features_ro_compat & XFS_SB_FEAT_RO_COMPAT_INOBTCNT):
 		features |= XFS_FEAT_INOBTCNT
-	if (cpu_to_be32(sb.sb_features_incompat) & XFS_SB_FEAT_INCOMPAT_FTYPE):
+	if (sb.sb_features_incompat & XFS_SB_FEAT_INCOMPAT_FTYPE):
 		features |= XFS_FEAT_FTYPE
-	if (cpu_to_be32(sb.sb_features_incompat) & XFS_SB_FEAT_INCOMPAT_SPINODES):
+	if (sb.sb_features_incompat & XFS_SB_FEAT_INCOMPAT_SPINODES):
 		features |= XFS_FEAT_SPINODES
-	if (cpu_to_be32(sb.sb_features_incompat) & XFS_SB_FEAT_INCOMPAT_META_UUID):
+	if (sb.sb_features_incompat & XFS_SB_FEAT_INCOMPAT_META_UUID):
 		features |= XFS_FEAT_META_UUID
-	if (cpu_to_be32(sb.sb_features_incompat) & XFS_SB_FEAT_INCOMPAT_BIGTIME):
+	if (sb.sb_features_incompat & XFS_SB_FEAT_INCOMPAT_BIGTIME):
 		features |= XFS_FEAT_BIGTIME
-	if (cpu_to_be32(sb.sb_features_incompat) & XFS_SB_FEAT_INCOMPAT_NEEDSREPAIR):
+	if (sb.sb_features_incompat & XFS_SB_FEAT_INCOMPAT_NEEDSREPAIR):
 		features |= XFS_FEAT_NEEDSREPAIR
-	if (cpu_to_be32(sb.sb_features_incompat) & XFS_SB_FEAT_INCOMPAT_NREXT64):
+	if (sb.sb_features_incompat & XFS_SB_FEAT_INCOMPAT_NREXT64):
 		features |= XFS_FEAT_NREXT64
 
 	return features
@@ -1550,19 +1607,16 @@ def xfs_bmdr_maxrecs(blocklen, is_leaf):
 		return blocklen // sizeof(xfs_bmdr_rec)
 	return blocklen // (sizeof(xfs_bmdr_key) + sizeof(xfs_bmdr_ptr))
 
-def xfs_dinode_has_bigtime(version, flags2, is_bigendian = True):
+def xfs_dinode_has_bigtime(version, flags2):
 	if version < 0x3:
 		return False
-	if is_bigendian:
-		return flags2 & cpu_to_be64(XFS_DIFLAG2_BIGTIME)
-	else:
-		return flags2 & XFS_DIFLAG2_BIGTIME
+	return flags2 & XFS_DIFLAG2_BIGTIME
 
 def unpack_bmbt_rec(bmbt_rec, is_bigendian = True):
 
 	if is_bigendian:
-		l0 = cpu_to_be64(bmbt_rec.l0)
-		l1 = cpu_to_be64(bmbt_rec.l1)
+		l0 = bmbt_rec.l0
+		l1 = bmbt_rec.l1
 	else:
 		l0 = bmbt_rec.l1
 		l1 = bmbt_rec.l0
@@ -1588,7 +1642,7 @@ def array_to_num(arr):
 def timestamp_to_str(timestamp, is_bigendian = True):
 
 	if is_bigendian:
-		_time = (cpu_to_be32(timestamp.t_sec) << 32) + cpu_to_be32(timestamp.t_nsec)
+		_time = ((timestamp.t_sec & 0xffffffff) << 32) + (timestamp.t_nsec & 0xffffffff)
 		_epoch = _time // NSEC_PER_SEC
 		_nano = _time % NSEC_PER_SEC
 		_epoch = _epoch - XFS_BIGTIME_EPOCH_OFFSET
@@ -1610,23 +1664,103 @@ def timestamp_to_str(timestamp, is_bigendian = True):
 def legacy_timestamp_to_str(timestamp, is_bigendian = True):
 
 	if is_bigendian:
-		_t = get_utc_str(cpu_to_be32(timestamp.t_sec))
-		_timestamp = _t.split("+")[0] + "." + str(cpu_to_be32(timestamp.t_nsec)).zfill(9)
+		_t = get_utc_str(timestamp.t_sec & 0xffffffff)
+		_timestamp = _t.split("+")[0] + "." + str(timestamp.t_nsec & 0xffffffff).zfill(9)
 	else:
 		_t = get_utc_str(timestamp.t_sec)
 		_timestamp = _t.split("+")[0] + "." + str(timestamp.t_nsec).zfill(9)
 	
 	return _timestamp
 
+def timestamp_to_raw(timestamp):
+	return ((timestamp.t_sec & 0xffffffff) << 32) | (timestamp.t_nsec & 0xffffffff)
+
+def raw_timestamp_to_epoch(raw, bigtime):
+
+	if bigtime:
+		return raw // NSEC_PER_SEC - XFS_BIGTIME_EPOCH_OFFSET
+	return raw >> 32
+
+def raw_timestamp_to_str(raw, bigtime):
+
+	if raw == None:
+		return "-"
+	return raw_timestamps_to_str([raw], [bigtime])[0]
+
+def raw_timestamps_to_str(raws, bigtimes):
+
+	_days = UTC_DAY_CACHE
+	_r = []
+	for _raw, _bigtime in zip(raws, bigtimes):
+		if _raw == None:
+			_r.append("-")
+			continue
+		if _bigtime:
+			_epoch = _raw // NSEC_PER_SEC - XFS_BIGTIME_EPOCH_OFFSET
+			_nano = _raw % NSEC_PER_SEC
+		else:
+			_epoch = _raw >> 32
+			_nano = _raw & 0xffffffff
+		if LOCAL_TIME_IS_FIXED and (UTC_EPOCH_MIN <= _epoch <= UTC_EPOCH_MAX):
+			_day, _sec = divmod(_epoch, 86400)
+			_date = _days.get(_day)
+			if _date == None:
+				_date = datetime.date.fromordinal(UTC_EPOCH_ORDINAL + _day).isoformat()
+				_days[_day] = _date
+			_r.append("%s %02d:%02d:%02d.%09d" % (_date, _sec // 3600, (_sec // 60) % 60, _sec % 60, _nano))
+		else:
+			_r.append(get_utc_str(_epoch).split("+")[0] + "." + str(_nano).zfill(9))
+	return _r
+
+def _local_time_is_fixed():
+
+	_offset = -time.timezone
+	try:
+		for _year in range(1970, 2038):
+			for _month in (1, 4, 7, 10):
+				_t = time.mktime((_year, _month, 1, 12, 0, 0, 0, 0, -1))
+				if time.localtime(_t).tm_gmtoff != _offset:
+					return False
+	except (OverflowError, ValueError, OSError):
+		return False
+	return True
+
+LOCAL_TIME_IS_FIXED = _local_time_is_fixed()
+UTC_EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+UTC_EPOCH_MIN = (datetime.date(1, 1, 2).toordinal() - UTC_EPOCH_ORDINAL) * 86400
+UTC_EPOCH_MAX = (datetime.date(9999, 12, 30).toordinal() - UTC_EPOCH_ORDINAL) * 86400
+UTC_DAY_CACHE = {}
+UTC_STR_CACHE = {}
+UTC_STR_CACHE_SIZE = 65536
+
 def get_utc_str(epoch):
 
+	_utc = UTC_STR_CACHE.get(epoch)
+	if _utc != None:
+		return _utc
+	if LOCAL_TIME_IS_FIXED and (UTC_EPOCH_MIN <= epoch <= UTC_EPOCH_MAX):
+		_day, _sec = divmod(epoch, 86400)
+		_date = UTC_DAY_CACHE.get(_day)
+		if _date == None:
+			_date = datetime.date.fromordinal(UTC_EPOCH_ORDINAL + _day).isoformat()
+			UTC_DAY_CACHE[_day] = _date
+		return "%s %02d:%02d:%02d+00:00" % (_date, _sec // 3600, (_sec // 60) % 60, _sec % 60)
+	_utc = _get_utc_str(epoch)
+	if len(UTC_STR_CACHE) >= UTC_STR_CACHE_SIZE:
+		UTC_STR_CACHE.clear()
+	UTC_STR_CACHE[epoch] = _utc
+	return _utc
+
+def _get_utc_str(epoch):
+
 	try:
 		_utc = str((datetime.datetime.fromtimestamp(0) + datetime.timedelta(seconds=epoch)).astimezone(datetime.timezone.utc))
 	except:
-		if len(str(datetime.datetime.now().astimezone()).split("+")) == 2:
-			_dh =int(str(datetime.datetime.now().astimezone()).split("+")[1].split(":")[0])
-		elif len(str(datetime.datetime.now().astimezone()).split("-")) == 4:
-			_dh =int("-" + str(datetime.datetime.now().astimezone()).split("-")[3].split(":")[0])
+		_now = str(datetime.datetime.now().astimezone())
+		if len(_now.split("+")) == 2:
+			_dh =int(_now.split("+")[1].split(":")[0])
+		elif len(_now.split("-")) == 4:
+			_dh =int("-" + _now.split("-")[3].split(":")[0])
 
 		_td = datetime.timedelta(hours=_dh)
 		_ltz = datetime.timezone(_td)
@@ -0,0 +1,48 @@
+DEFAULT_READ_GAP = 64 * 1024
+DEFAULT_READ_MAX = 4 * 1024 * 1024
+
+class ReadScheduler:
+
+	def submit(self, offset, size):
+
+		self._requests.append((offset, size))
+
+	def _merge(self):
+
+		_merged = []
+		for _offset, _size in sorted(self._requests):
+			if _size <= 0:
+				continue
+			if len(_merged) > 0:
+				_m = _merged[-1]
+				_end = max(_m[1], _offset + _size)
+				if (_offset <= _m[1] + self.gap) and (_end - _m[0] <= self.max_size):
+					_m[1] = _end
+					continue
+			_merged.append([_offset, _offset + _size])
+		return _merged
+
+	def run(self):
+
+		_merged = self._merge()
+		self.requests += len(self._requests)
+		self.reads += len(_merged)
+		_read = lambda _m: self.reader(_m[0], _m[1] - _m[0])
+		if (self.pool != None) and (len(_merged) > 1):
+			_bufs = list(self.pool.map(_read, _merged))
+		else:
+			_bufs = [_read(_m) for _m in _merged]
+
+		self.buffers = [(_m[0], _buf) for _m, _buf in zip(_merged, _bufs)]
+		self._requests = []
+
+	def __init__(self, reader, gap = DEFAULT_READ_GAP, max_size = DEFAULT_READ_MAX, pool = None):
+
+		self.reader = reader
+		self.gap = gap
+		self.max_size = max_size
+		self.pool = pool
+		self.requests = 0
+		self.reads = 0
+		self.buffers = []
+		self._requests = []
@@ -0,0 +1,54 @@
+import shutil
+
+WRITER_BUFFER_SIZE = 1024 * 1024
+WRITER_BATCH_ROWS = 4096
+
+class Writer:
+
+	def put(self, row):
+
+		self._rows.append(row)
+		if len(self._rows) >= self._batch_rows:
+			self.flush()
+
+	def put_file(self, path):
+
+		self.flush()
+		with open(path, "r", encoding="utf-8") as _f:
+			shutil.copyfileobj(_f, self._fd, self._buffer_size)
+
+	def flush(self):
+
+		if len(self._rows) > 0:
+			self._rows.append("")
+			self._fd.write("\n".join(self._rows))
+			self._rows = []
+
+	def close(self):
+
+		if self._fd != None:
+			self.flush()
+			self._fd.close()
+			self._fd = None
+
+	def __init__(self, path, buffer_size = WRITER_BUFFER_SIZE, batch_rows = WRITER_BATCH_ROWS):
+
+		self._fd = None
+		self._rows = []
+		self._buffer_size = buffer_size
+		self._batch_rows = batch_rows
+		self._fd = open(path, "w", encoding="utf-8", buffering=buffer_size)
+
+class MemoryWriter:
+
+	def put(self, row):
+		self.rows.append(row)
+
+	def flush(self):
+		pass
+
+	def close(self):
+		pass
+
+	def __init__(self):
+		self.rows = []
@@ -5,12 +5,67 @@
 from ctypes import *
 import sys
 import struct
-import copy
+import array
 from .misc import *
 from .inode_rec import *
+from .image import *
+from .cache import *
+from .geometry import *
+from .writer import *
+from .filter import *
 import os
+import shutil
+import tempfile
+import multiprocessing
 
 q="\"\""
+XFS_DIR3_FT_NAMES = dict((_ft.value, _ft.name) for _ft in xfs_dir3_ft)
+
+META_COLUMNS = ("inode", "name", "mode", "uid", "gid", "size", \
+				"atime", "mtime", "ctime", "crtime", "xfs_dir3_ft", \
+				"di_mode_ft", "parent_inode", "path", "sl_target", "attrs", "is_deleted")
+
+def _meta_parent_inode(inode_rec):
+	_parent_inode_num = max(inode_rec.parent_inode_num, 0)
+	return "0x%x(%d)" % (_parent_inode_num, _parent_inode_num)
+
+def _meta_xfs_dir3_ft(xfs, inode_rec):
+	if inode_rec.has_core and xfs_has_ftype(xfs._m_features):
+		return inode_rec.ftype
+	return "-"
+
+def _meta_di_mode_ft(inode_rec):
+	if inode_rec.has_core:
+		return conv_type_to_str(get_type(inode_rec.mode))
+	return "-"
+
+INODE_REC_BATCH_SIZE = 4096
+SUBTREE_SPLIT_DIRS = 64
+SUBTREE_BATCHES_PER_JOB = 4
+WALK_CHUNK_DIRS = 1024
+WALK_CHUNK_BYTES = 4 * 1024 * 1024
+WALK_CHUNK_ENTRIES = 4096
+LOG_BATCH_SIZE = 4 * 1024 * 1024
+
+META_FORMATTERS = {
+	"inode": lambda xfs, r: "0x%x(%d)" % (r.inode_num, r.inode_num),
+	"name": lambda xfs, r: "\"%s\"" % r.name,
+	"mode": lambda xfs, r: "0o%o" % r.mode,
+	"uid": lambda xfs, r: "%d" % r.uid,
+	"gid": lambda xfs, r: "%d" % r.gid,
+	"size": lambda xfs, r: "%d" % r.size,
+	"atime": None,
+	"mtime": None,
+	"ctime": None,
+	"crtime": None,
+	"xfs_dir3_ft": _meta_xfs_dir3_ft,
+	"di_mode_ft": lambda xfs, r: _meta_di_mode_ft(r),
+	"parent_inode": lambda xfs, r: _meta_parent_inode(r),
+	"path": lambda xfs, r: "\"%s\"" % r.parent_path,
+	"sl_target": lambda xfs, r: "\"%s\"" % r.sl_target,
+	"attrs": lambda xfs, r: "\"%s\"" % str(r.attrs),
+	"is_deleted": lambda xfs, r: str(r.is_deleted),
+}
 
 class XFS:
 
@@ -18,98 +73,33 @@ class XFS:
 
 		if self.first_inode_number == None:
 			return
-		if self.deleted:
-			print("%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s" \
-					% \
-					("inode", "name", "mode", "uid", "gid", "size", \
-					"atime", "mtime", "ctime", "crtime", "xfs_dir3_ft", \
-					"di_mode_ft", "parent_inode", "path", "sl_target", "attrs", "is_deleted"), file = self.out_fd)
-		else:
-			print("%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s" \
-					% \
-					("inode", "name", "mode", "uid", "gid", "size", \
-					"atime", "mtime", "ctime", "crtime", "xfs_dir3_ft", \
-					"di_mode_ft", "parent_inode", "path", "sl_target", "attrs"), file = self.out_fd)
+		self.out.put(",".join(self.columns))
 
 	def _put_inode_rec(self, inode_rec):
 
 		if inode_rec.inode_num < 0:
 			return
+		self.inode_rec_batch.append(inode_rec)
+		if len(self.inode_rec_batch) >= INODE_REC_BATCH_SIZE:
+			self._flush_inode_recs()
 
-		_data_fork_type_str = "-"
-		_atime = "-"
-		_mtime = "-"
-		_ctime = "-"
-		_crtime = "-"
-		_di_mode = -1
-		_di_uid = -1
-		_di_gid = -1
-		_di_size = -1
-		_ftype_str = "-"
-		_parent_inode_num = inode_rec.parent_inode_num
-		if inode_rec.parent_inode_num < 0:
-			_parent_inode_num = 0
-
-		if inode_rec.inode_core != None:
-			if xfs_dinode_has_bigtime(inode_rec.inode_core.di_version, inode_rec.inode_core.di_flags2):
-				_atime = timestamp_to_str(inode_rec.inode_core.di_atime)
-				_mtime = timestamp_to_str(inode_rec.inode_core.di_mtime)
-				_ctime = timestamp_to_str(inode_rec.inode_core.di_ctime)
-				_crtime = timestamp_to_str(inode_rec.inode_core.di_crtime)
-			else:
-				_atime = legacy_timestamp_to_str(inode_rec.inode_core.di_atime)
-				_mtime = legacy_timestamp_to_str(inode_rec.inode_core.di_mtime)
-				_ctime = legacy_timestamp_to_str(inode_rec.inode_core.di_ctime)
-				_crtime = legacy_timestamp_to_str(inode_rec.inode_core.di_crtime)
-			_di_mode = cpu_to_be16(inode_rec.inode_core.di_mode)
-			_di_uid = cpu_to_be32(inode_rec.inode_core.di_uid)
-			_di_gid = cpu_to_be32(inode_rec.inode_core.di_gid)
-			_di_size = cpu_to_be64(inode_rec.inode_core.di_size)
-			_data_fork_type_str = conv_type_to_str(get_type(inode_rec.inode_core.di_mode))
-			if inode_rec.inode_core.di_version != 0x03:
-				_crtime = "-"
-			if xfs_has_ftype(self._m_features):
-				_ftype_str = inode_rec.ftype
+	def _flush_inode_recs(self):
 
-		if self.deleted:
-			print("0x%x(%d),\"%s\",0o%o,%d,%d,%d,%s,%s,%s,%s,%s,%s,0x%x(%d),\"%s\",\"%s\",\"%s\",%s" \
-					% \
-					(inode_rec.inode_num,inode_rec.inode_num,\
-					inode_rec.name,\
-					_di_mode,\
-					_di_uid,\
-					_di_gid,\
-					_di_size,\
-					_atime,\
-					_mtime,\
-					_ctime,\
-					_crtime,\
-					_ftype_str,\
-					_data_fork_type_str,\
-					_parent_inode_num,_parent_inode_num,\
-					inode_rec.parent_path,\
-					inode_rec.sl_target,\
-					str(inode_rec.attrs),\
-					str(inode_rec.is_deleted)), file = self.out_fd)
-		else:
-			print("0x%x(%d),\"%s\",0o%o,%d,%d,%d,%s,%s,%s,%s,%s,%s,0x%x(%d),\"%s\",\"%s\",\"%s\"" \
-					% \
-					(inode_rec.inode_num,inode_rec.inode_num,\
-					inode_rec.name,\
-					_di_mode,\
-					_di_uid,\
-					_di_gid,\
-					_di_size,\
-					_atime,\
-					_mtime,\
-					_ctime,\
-					_crtime,\
-					_ftype_str,\
-					_data_fork_type_str,\
-					_parent_inode_num,_parent_inode_num,\
-					inode_rec.parent_path,\
-					inode_rec.sl_target,\
-					str(inode_rec.attrs)), file = self.out_fd)
+		_recs = self.inode_rec_batch
+		if len(_recs) == 0:
+			return
+		self.inode_rec_batch = []
+		_bigtimes = None
+		_columns = []
+		for _c, _f in zip(self.columns, self.meta_formatters):
+			if _f == None:
+				if _bigtimes == None:
+					_bigtimes = [_r.bigtime for _r in _recs]
+				_columns.append(raw_timestamps_to_str([getattr(_r, _c) for _r in _recs], _bigtimes))
+			else:
+				_columns.append([_f(self, _r) for _r in _recs])
+		for _row in zip(*_columns):
+			self.out.put(",".join(_row))
 
 	def _get_inode_core(self, inumber):
 
@@ -118,111 +108,108 @@ class XFS:
 		_o = self._get_inode_offset(inumber)
 		if _o == None:
 			return None, None
-		self.in_fd.seek(_o)
-		_ptr = self.in_fd.read(sizeof(xfs_dinode))
-		_dinode = New(_ptr, xfs_dinode)
-		if cpu_to_be16(_dinode.di_magic) == XFS_DINODE_MAGIC:
-			_inode_core = copy.deepcopy(_dinode)
+		_ptr = self.cache.read(_o, sizeof(xfs_dinode))
+		_inode_core = New(_ptr, xfs_dinode)
+		if _inode_core.di_magic == XFS_DINODE_MAGIC:
 			return _o, _inode_core
 		else:
 			return None, None
 
-	def _get_ag_no_from_inode(self, inode_core, is_bigendian = True):
+	def _get_inode_cores(self, inumbers):
 
-		if inode_core.di_version != 0x3:
-			return 0
-		if is_bigendian:
-			_di_ino = cpu_to_be64(inode_core.di_ino)
-		else:
-			_di_ino = inode_core.di_ino
-		_ag_no = _di_ino >> (self.superblocks[0][0].sb_agblklog + self.superblocks[0][0].sb_inopblog)
-
-		return _ag_no
-
-	def _set_leaf_dir(self, _data_fork_offset, inode_core, parent_inumber = -9, parent_path = ""):
-
-		self.in_fd.seek(_data_fork_offset)
-		_ptr = self.in_fd.read(sizeof(xfs_bmbt_rec))
+		_clusters = {}
+		for _inumber in inumbers:
+			if _inumber < 0:
+				continue
+			_co = self.geometry.ino_to_cluster_offset(_inumber)
+			if _co == None:
+				continue
+			if _co not in _clusters:
+				_clusters[_co] = []
+			_clusters[_co].append(_inumber)
+
+		_cores = {}
+		_cs = self.geometry.inode_cluster_size
+		self.cache.load([(_co, _cs) for _co in _clusters])
+		for _co in sorted(_clusters):
+			_buf = self.cache.read(_co, _cs)
+			for _inumber in _clusters[_co]:
+				_o = self._get_inode_offset(_inumber)
+				if _o - _co + sizeof(xfs_dinode) > len(_buf):
+					continue
+				_inode_core = New(_buf, xfs_dinode, _o - _co)
+				if _inode_core.di_magic == XFS_DINODE_MAGIC:
+					_cores[_inumber] = (_o, _inode_core)
+
+		return _cores
+
+	def _set_leaf_dir(self, _data_fork_offset, inode_core, parent_inumber = -9):
+
+		_ptr = self.cache.read(_data_fork_offset, sizeof(xfs_bmbt_rec))
 		_bmbt_rec = New(_ptr, xfs_bmbt_rec)
-		_bmbt_irec = copy.deepcopy(unpack_bmbt_rec(_bmbt_rec))
-		_ag_no = self._get_ag_no_from_inode(inode_core)
-		_size = _bmbt_irec.br_blockcount * cpu_to_be32(self.superblocks[_ag_no][0].sb_blocksize)
-
-		_ag_no = _bmbt_irec.br_startblock >> self.superblocks[0][0].sb_agblklog
-		_rel_mask = (1 << self.superblocks[0][0].sb_agblklog) -1
-		_rel_block = _bmbt_irec.br_startblock & _rel_mask
-		_sb_blocksize = cpu_to_be32(self.superblocks[_ag_no][0].sb_blocksize)
-		_is_sb_version_5 = False
-		if XFS_SB_VERSION_NUM(self.superblocks[_ag_no][0].sb_versionnum) == XFS_SB_VERSION_5:
-			_is_sb_version_5 = True
-
-		_o = (_ag_no * cpu_to_be32(self.superblocks[_ag_no][0].sb_agblocks) + _rel_block) * cpu_to_be32(self.superblocks[_ag_no][0].sb_blocksize)
-		self.in_fd.seek(_o)
+		_bmbt_irec = unpack_bmbt_rec(_bmbt_rec)
+		_sb_blocksize = self.geometry.blocksize
+		_is_sb_version_5 = self.geometry.is_v5
+		_o = self.geometry.fsb_to_offset(_bmbt_irec.br_startblock)
 		if _is_sb_version_5:
-			_ptr = self.in_fd.read(sizeof(xfs_dir3_blk_hdr))
-			_dir3_blk_hdr = copy.deepcopy(New(_ptr, xfs_dir3_blk_hdr))
-			if cpu_to_be32(_dir3_blk_hdr.magic) != XFS_DIR3_BLOCK_MAGIC and \
-				cpu_to_be32(_dir3_blk_hdr.magic) != XFS_DIR3_DATA_MAGIC:
+			_ptr = self.cache.read(_o, sizeof(xfs_dir3_blk_hdr))
+			_dir3_blk_hdr = New(_ptr, xfs_dir3_blk_hdr)
+			if _dir3_blk_hdr.magic != XFS_DIR3_BLOCK_MAGIC and \
+				_dir3_blk_hdr.magic != XFS_DIR3_DATA_MAGIC:
 				return
 		else:
-			_ptr = self.in_fd.read(sizeof(xfs_dir2_data_hdr))
-			_dir2_data_hdr = copy.deepcopy(New(_ptr, xfs_dir2_data_hdr))
-			if cpu_to_be32(_dir2_data_hdr.magic) != XFS_DIR2_BLOCK_MAGIC and \
-				cpu_to_be32(_dir2_data_hdr.magic) != XFS_DIR2_DATA_MAGIC:
+			_ptr = self.cache.read(_o, sizeof(xfs_dir2_data_hdr))
+			_dir2_data_hdr = New(_ptr, xfs_dir2_data_hdr)
+			if _dir2_data_hdr.magic != XFS_DIR2_BLOCK_MAGIC and \
+				_dir2_data_hdr.magic != XFS_DIR2_DATA_MAGIC:
 				return
 
 		for _b in range(_bmbt_irec.br_blockcount):
-			_o_in_block = _b * _sb_blocksize
-			_l = (_b + 1 ) * _sb_blocksize
-			self.in_fd.seek(_o + _o_in_block)
+			_blk = self.cache.read(_o + _b * _sb_blocksize, _sb_blocksize)
 			if _is_sb_version_5:
-				_o_in_block += sizeof(xfs_dir3_data_hdr)
-				_ptr = self.in_fd.read(sizeof(xfs_dir3_data_hdr))
-				_data_hdr = copy.deepcopy(New(_ptr, xfs_dir3_data_hdr))
+				_o_in_block = sizeof(xfs_dir3_data_hdr)
+				_data_hdr = New(_blk, xfs_dir3_data_hdr)
 			else:
-				_o_in_block += sizeof(xfs_dir2_data_hdr)
-				_ptr = self.in_fd.read(sizeof(xfs_dir2_data_hdr))
-				_data_hdr = copy.deepcopy(New(_ptr, xfs_dir2_data_hdr))
+				_o_in_block = sizeof(xfs_dir2_data_hdr)
+				_data_hdr = New(_blk, xfs_dir2_data_hdr)
+			_l = len(_blk)
 			while _o_in_block < _l:
-				_o_in_block = self._parse_xfs_dir2_data(_o, _o_in_block, parent_inumber, parent_path)
+				_o_in_block = self._parse_xfs_dir2_data(_blk, _o_in_block, parent_inumber)
 
-	def _parse_xfs_dir2_data(self, offset, offset_in_block, parent_inumber, parent_path):
+	def _parse_xfs_dir2_data(self, blk, offset_in_block, parent_inumber):
 
-		_o = offset
 		_o_in_block = offset_in_block
-		_o_to_dir2_data_union = _o + _o_in_block
-		self.in_fd.seek(_o_to_dir2_data_union)
-		_ptr = self.in_fd.read(sizeof(xfs_dir2_data_union))
-		_xfs_dir2_data_union = copy.deepcopy(New(_ptr, xfs_dir2_data_union))
-		if (not self.deleted) and (cpu_to_be16(_xfs_dir2_data_union.unused.freetag) == 0xffff):
-			_o_in_block += cpu_to_be16(_xfs_dir2_data_union.unused.length)
+		if _o_in_block + sizeof(xfs_dir2_data_union) > len(blk):
+			return len(blk)
+		_xfs_dir2_data_union = New(blk, xfs_dir2_data_union, _o_in_block)
+		if (not self.deleted) and (_xfs_dir2_data_union.unused.freetag == 0xffff):
+			_o_in_block += _xfs_dir2_data_union.unused.length
 		else:
 			_d = False
-			if cpu_to_be16(_xfs_dir2_data_union.unused.freetag) == 0xffff:
+			if _xfs_dir2_data_union.unused.freetag == 0xffff:
 				_d = True
 				if (self.last_inode_number & 0x00000000ffffffff) == self.last_inode_number:
-					_inumber = cpu_to_be64(_xfs_dir2_data_union.entry.inumber) & 0x00000000ffffffff
+					_inumber = _xfs_dir2_data_union.entry.inumber & 0x00000000ffffffff
 				else:
 					_inumber = -1
-				_free_len = cpu_to_be64(_xfs_dir2_data_union.entry.inumber) & 0x0000ffff00000000
+				_free_len = _xfs_dir2_data_union.entry.inumber & 0x0000ffff00000000
 				_free_len = _free_len >> 32
 				_o_in_block_back = _o_in_block + _free_len
 			else:
-				_inumber = cpu_to_be64(_xfs_dir2_data_union.entry.inumber)
+				_inumber = _xfs_dir2_data_union.entry.inumber
 
 			_namelen = _xfs_dir2_data_union.entry.namelen
 			_o_in_block += sizeof(c_uint64) + sizeof(c_uint8)
-			_o_to_name = _o + _o_in_block
-			self.in_fd.seek(_o_to_name)
 			try:
-				_name = self.in_fd.read(_namelen).decode('utf-8', errors='ignore').replace('\x00','')
+				_name = blk[_o_in_block:_o_in_block + _namelen].decode('utf-8', errors='ignore').replace('\x00','')
 			except Exception as e:
 				_name =""
 
 			_o_in_block += _namelen
 			_ftype = 0
 			if xfs_has_ftype(self._m_features):
-				_ftype, = struct.unpack(">B", self.in_fd.read(sizeof(c_uint8)))
+				if _o_in_block < len(blk):
+					_ftype = blk[_o_in_block]
 				_o_in_block += sizeof(c_uint8)
 			if _d == False:
 				_o_in_block += sizeof(xfs_dir2_data_off)
@@ -230,285 +217,169 @@ class XFS:
 			else:
 				_o_in_block = _o_in_block_back
 
-			_offset, _inode_core = self._get_inode_core(_inumber)
-			if (_name != ".") and (_name != "..") and (_offset != None) and (_d == False):
-				inode_rec = InodeRec()
-				inode_rec.parent_inode_num =  parent_inumber
-				inode_rec.inode_core = _inode_core
-				inode_rec.inode_num = _inumber
-				inode_rec.name = _name
-				inode_rec.parent_path = parent_path
-				if not any(_ptr.value == _ftype for _ptr in xfs_dir3_ft):
-					_ftype = 0
-				inode_rec.ftype = xfs_dir3_ft(_ftype).name
-				if parent_path == "/":
-					_cur_path = parent_path + str(_name)
-				else:
-					_cur_path = parent_path + "/" + str(_name)
-				inode_rec.is_deleted = False
-
-				_dft = get_type(_inode_core.di_mode)
-				if _dft == S_IFLNK:
-					if _inode_core.di_format == xfs_dinode_fmt.XFS_DINODE_FMT_LOCAL:
-						inode_rec.sl_target = self._get_short_form_sl(_inumber, _inode_core)
-					elif _inode_core.di_format == xfs_dinode_fmt.XFS_DINODE_FMT_EXTENTS:
-						inode_rec.sl_target = self._get_block_sl(_inumber, _inode_core)
-				if _inode_core.di_aformat == 1:
-					inode_rec.attrs = self._get_short_form_attr(_inumber, _inode_core)
-				self._put_inode_rec(copy.deepcopy(inode_rec))
-				self._load_inode_detail(_offset, _inode_core, _inumber, _cur_path)
-			elif (_offset == None) or (_d == True):
-				inode_rec = InodeRec()
-				inode_rec.parent_inode_num =  parent_inumber
-				inode_rec.inode_core = _inode_core
-				if _offset != None:
-					inode_rec.inode_num = _inumber
-				else:
-					inode_rec.inode_num = -1
-				inode_rec.name = _name
-				inode_rec.parent_path = parent_path
-				if not any(_ptr.value == _ftype for _ptr in xfs_dir3_ft):
-					_ftype = 0
-				inode_rec.ftype = xfs_dir3_ft(_ftype).name
-				if parent_path == "/":
-					_cur_path = parent_path + str(_name)
-				else:
-					_cur_path = parent_path + "/" + str(_name)
-				inode_rec.is_deleted = True
-
-				if _inode_core != None:
-					_dft = get_type(_inode_core.di_mode)
-					if _dft == S_IFLNK:
-						if _inode_core.di_format == xfs_dinode_fmt.XFS_DINODE_FMT_LOCAL:
-							inode_rec.sl_target = self._get_short_form_sl(_inumber, _inode_core)
-						elif _inode_core.di_format == xfs_dinode_fmt.XFS_DINODE_FMT_EXTENTS:
-							inode_rec.sl_target = self._get_block_sl(_inumber, _inode_core)
-					if _inode_core.di_aformat == 1:
-						inode_rec.attrs = self._get_short_form_attr(_inumber, _inode_core)
-
-				self._put_inode_rec(copy.deepcopy(inode_rec))
+			if _d or ((_name != ".") and (_name != "..")):
+				self.pending_entries.append((_inumber, _name, _ftype, parent_inumber, _d, None))
 
 		return _o_in_block
 
-	def _set_block_dir(self, data_fork_offset, inode_core, parent_inumber = -9, parent_path = ""):
+	def _set_block_dir(self, data_fork_offset, inode_core, parent_inumber = -9):
 
-		_nextents = cpu_to_be32(inode_core.di_nextents)
-		self.in_fd.seek(data_fork_offset)
+		_nextents = inode_core.di_nextents
 		if _nextents == 0:
 			pass
 		elif _nextents == 1:
-			_ptr = self.in_fd.read(sizeof(xfs_bmbt_rec))
+			_ptr = self.cache.read(data_fork_offset, sizeof(xfs_bmbt_rec))
 			_bmbt_rec = New(_ptr, xfs_bmbt_rec)
-			_bmbt_irec = copy.deepcopy(unpack_bmbt_rec(_bmbt_rec))
-			_ag_no = self._get_ag_no_from_inode(inode_core)
-			_size = _bmbt_irec.br_blockcount * cpu_to_be32(self.superblocks[_ag_no][0].sb_blocksize)
-			_is_sb_version_5 = False
-			if XFS_SB_VERSION_NUM(self.superblocks[_ag_no][0].sb_versionnum) == XFS_SB_VERSION_5:
-				_is_sb_version_5 = True
-			_ag_no = _bmbt_irec.br_startblock >> self.superblocks[0][0].sb_agblklog
-			_rel_mask = (1 << self.superblocks[0][0].sb_agblklog) -1
-			_rel_block = _bmbt_irec.br_startblock & _rel_mask
-			_o = (_ag_no * cpu_to_be32(self.superblocks[_ag_no][0].sb_agblocks) + _rel_block) * cpu_to_be32(self.superblocks[_ag_no][0].sb_blocksize)
+			_bmbt_irec = unpack_bmbt_rec(_bmbt_rec)
+			_size = _bmbt_irec.br_blockcount * self.geometry.blocksize
+			_is_sb_version_5 = self.geometry.is_v5
+			_o = self.geometry.fsb_to_offset(_bmbt_irec.br_startblock)
+			_blk = self.cache.read(_o, _size)
+			if len(_blk) < _size:
+				return
 			_o_in_block = 0
-			self.in_fd.seek(_o)
 			if _is_sb_version_5:
 				_o_in_block += sizeof(xfs_dir3_data_hdr)
-				_ptr = self.in_fd.read(sizeof(xfs_dir3_data_hdr))
-				_data_hdr = copy.deepcopy(New(_ptr, xfs_dir3_data_hdr))
+				_data_hdr = New(_blk, xfs_dir3_data_hdr)
 			else:
 				_o_in_block += sizeof(xfs_dir2_data_hdr)
-				_ptr = self.in_fd.read(sizeof(xfs_dir2_data_hdr))
-				_data_hdr = copy.deepcopy(New(_ptr, xfs_dir2_data_hdr))
+				_data_hdr = New(_blk, xfs_dir2_data_hdr)
 
-			_o_to_dir2_block_tail = _o + _size - sizeof(xfs_dir2_block_tail)
-			self.in_fd.seek(_o_to_dir2_block_tail)
-			_ptr = self.in_fd.read(sizeof(xfs_dir2_block_tail))
-			_dir2_block_tail = copy.deepcopy(New(_ptr, xfs_dir2_block_tail))
+			_dir2_block_tail = New(_blk, xfs_dir2_block_tail, _size - sizeof(xfs_dir2_block_tail))
 
-			_o_to_dir2_leaf_entry_in_block = _size - sizeof(xfs_dir2_block_tail) - cpu_to_be32(_dir2_block_tail.count) * sizeof(xfs_dir2_leaf_entry)
+			_o_to_dir2_leaf_entry_in_block = _size - sizeof(xfs_dir2_block_tail) - _dir2_block_tail.count * sizeof(xfs_dir2_leaf_entry)
 			while _o_in_block < _o_to_dir2_leaf_entry_in_block:
-				_o_in_block = self._parse_xfs_dir2_data(_o, _o_in_block, parent_inumber, parent_path)
+				_o_in_block = self._parse_xfs_dir2_data(_blk, _o_in_block, parent_inumber)
 		else:
 			for _i in range(_nextents):
-				self._set_leaf_dir(data_fork_offset, inode_core, parent_inumber, parent_path)
+				self._set_leaf_dir(data_fork_offset, inode_core, parent_inumber)
 				data_fork_offset += sizeof(xfs_bmbt_rec)
 
-	def _set_short_form_dir(self, data_fork_offset, parent_inumber = -9, parent_path = ""):
+	def _set_short_form_dir(self, data_fork_offset, inode_core, parent_inumber = -9):
 
-		_ptr = self.in_fd.read(sizeof(xfs_dir2_sf_hdr))
-		__dir2_sf_hdr = New(_ptr, xfs_dir2_sf_hdr)
-		_dir2_sf_hdr = copy.deepcopy(__dir2_sf_hdr)
+		_buf = self.cache.read(data_fork_offset, \
+				XFS_LITINO(self.geometry.inodesize, inode_core.di_version))
+		if len(_buf) < sizeof(xfs_dir2_sf_hdr):
+			return
+		_dir2_sf_hdr = New(_buf, xfs_dir2_sf_hdr)
 		if _dir2_sf_hdr.i8count > 0:
 			_count = _dir2_sf_hdr.i8count
-			_dir2_sf_entry_offset = data_fork_offset + sizeof(c_uint8) + sizeof(c_uint8) + sizeof(xfs_dir2_ino8)
+			_dir2_sf_entry_offset = sizeof(c_uint8) + sizeof(c_uint8) + sizeof(xfs_dir2_ino8)
 			_parent_inode_num = array_to_num(_dir2_sf_hdr.parent.i8)
 		else:
 			_count = _dir2_sf_hdr.count
-			_dir2_sf_entry_offset = data_fork_offset + sizeof(c_uint8) + sizeof(c_uint8) + sizeof(xfs_dir2_ino4)
+			_dir2_sf_entry_offset = sizeof(c_uint8) + sizeof(c_uint8) + sizeof(xfs_dir2_ino4)
 			_parent_inode_num = array_to_num(_dir2_sf_hdr.parent.i4)
 		_i = 0
 		if parent_inumber != -9:
 			_parent_inode_num = parent_inumber
+		self.sf_groups += 1
+		_group = self.sf_groups
 
 		while True:
 			if (not self.deleted) and (_i >= _count):
 				break
 
-			self.in_fd.seek(_dir2_sf_entry_offset)
-			_ptr = self.in_fd.read(sizeof(xfs_dir2_sf_entry))
-			dir2_sf_entry = New(_ptr, xfs_dir2_sf_entry)
-			_namelen = dir2_sf_entry.namelen
+			if _dir2_sf_entry_offset + sizeof(c_uint8) + sizeof(xfs_dir2_sf_off) > len(_buf):
+				break
+			_namelen = _buf[_dir2_sf_entry_offset]
 			_dir2_sf_entry_offset += sizeof(c_uint8) + sizeof( xfs_dir2_sf_off)
-			self.in_fd.seek(_dir2_sf_entry_offset)
 			try:
-				_name = self.in_fd.read(_namelen).decode('utf-8', errors='ignore').replace('\x00','')
+				_name = _buf[_dir2_sf_entry_offset:_dir2_sf_entry_offset + _namelen].decode('utf-8', errors='ignore').replace('\x00','')
 			except Exception as e:
 				_name = ""
 
 			_dir2_sf_entry_offset += _namelen
-			self.in_fd.seek(_dir2_sf_entry_offset)
 			_ftype = 0
 			if xfs_has_ftype(self._m_features):
-				_ftype, = struct.unpack(">B", self.in_fd.read(sizeof(c_uint8)))
+				if _dir2_sf_entry_offset >= len(_buf):
+					break
+				_ftype = _buf[_dir2_sf_entry_offset]
 				_dir2_sf_entry_offset += sizeof(c_uint8)
 
 			if _dir2_sf_hdr.i8count > 0:
 				_inumber_len = sizeof(xfs_dir2_ino8)
-				_inumber, = struct.unpack(">Q", self.in_fd.read(_inumber_len))
+				_fmt = ">Q"
 			else:
 				_inumber_len = sizeof(xfs_dir2_ino4)
-				_inumber, = struct.unpack(">I", self.in_fd.read(_inumber_len))
+				_fmt = ">I"
+			if _dir2_sf_entry_offset + _inumber_len > len(_buf):
+				break
+			_inumber, = struct.unpack_from(_fmt, _buf, _dir2_sf_entry_offset)
 
 			_dir2_sf_entry_offset += _inumber_len
-			_offset, _inode_core = self._get_inode_core(_inumber)
-			if _offset == None:
-				break
-			inode_rec = InodeRec()
-			inode_rec.parent_inode_num = _parent_inode_num
-			inode_rec.inode_core = _inode_core
-			inode_rec.name = _name
-			inode_rec.parent_path = parent_path
-			inode_rec.inode_num = _inumber
-			inode_rec.ftype = xfs_dir3_ft(_ftype).name
-			if _i >= _count:
-				inode_rec.is_deleted = True
-			if parent_path == "/":
-				_cur_path = parent_path + str(_name)
-			else:
-				_cur_path = parent_path + "/" + str(_name)
-
-			_dft = get_type(_inode_core.di_mode)
-			if _dft == S_IFLNK:
-				if _inode_core.di_format == xfs_dinode_fmt.XFS_DINODE_FMT_LOCAL:
-					inode_rec.sl_target = self._get_short_form_sl(_inumber, _inode_core)
-				elif _inode_core.di_format == xfs_dinode_fmt.XFS_DINODE_FMT_EXTENTS:
-					inode_rec.sl_target = self._get_block_sl(_inumber, _inode_core)
-			if _inode_core.di_aformat == 1:
-				inode_rec.attrs = self._get_short_form_attr(_inumber, _inode_core)
-
-			self._put_inode_rec(copy.deepcopy(inode_rec))
-			if not inode_rec.is_deleted:
-				self._load_inode_detail(_offset, _inode_core, _inumber, _cur_path)
+			self.pending_entries.append((_inumber, _name, _ftype, _parent_inode_num, _i >= _count, _group))
 			_i += 1
 
-	def _set_btree_dir(self, _data_fork_offset, inode_core, parent_inumber = -9, is_root = False, parent_path = ""):
+	def _set_btree_dir(self, _data_fork_offset, inode_core, parent_inumber = -9, is_root = False):
 
 		_bb_level = 0
 		_bb_numrecs = 0
 		_bmdr_block = None
 		_o = _data_fork_offset
-		self.in_fd.seek(_o)
 		if is_root:
-			_ptr = self.in_fd.read(sizeof(xfs_bmdr_block))
+			_ptr = self.cache.read(_o, sizeof(xfs_bmdr_block))
 			_o += sizeof(xfs_bmdr_block)
-			__bmdr_block = New(_ptr, xfs_bmdr_block)
-			_bmdr_block = copy.deepcopy(__bmdr_block)
-			_bb_level = cpu_to_be16(_bmdr_block.bb_level)
-			_bb_numrecs = cpu_to_be16(_bmdr_block.bb_numrecs)
+			_bmdr_block = New(_ptr, xfs_bmdr_block)
+			_bb_level = _bmdr_block.bb_level
+			_bb_numrecs = _bmdr_block.bb_numrecs
 		else:
-			_ptr = self.in_fd.read(sizeof(xfs_bmbt_block))
+			_ptr = self.cache.read(_o, sizeof(xfs_bmbt_block))
 			_o += sizeof(xfs_bmbt_block)
-			__bmbt_block = New(_ptr, xfs_bmbt_block)
-			_bmbt_block = copy.deepcopy(__bmbt_block)
-			if XFS_SB_VERSION_NUM(self.superblocks[0][0].sb_versionnum) != XFS_SB_VERSION_5:
+			_bmbt_block = New(_ptr, xfs_bmbt_block)
+			if not self.geometry.is_v5:
 				_o -= (sizeof(c_uint64) * 3 + sizeof(c_uint32) * 2 + sizeof(uuid))
-				self.in_fd.seek(_o)
 
-			_bb_level = cpu_to_be16(_bmbt_block.bb_level)
-			_bb_numrecs = cpu_to_be16(_bmbt_block.bb_numrecs)
+			_bb_level = _bmbt_block.bb_level
+			_bb_numrecs = _bmbt_block.bb_numrecs
 
-		_ag_no = self._get_ag_no_from_inode(inode_core)
 		_dblocksize = XFS_DFORK_SIZE(inode_core.di_forkoff, \
-					cpu_to_be16(self.superblocks[_ag_no][0].sb_inodesize), \
+					self.geometry.inodesize, \
 					inode_core.di_version, XFS_DATA_FORK)
 		if _bb_level > 0:
 			_maxrecs = xfs_bmdr_maxrecs(_dblocksize, False)
 			_bmbt_ptrs = []
 			_o += _maxrecs * sizeof(xfs_bmbt_key)
-			self.in_fd.seek(_o)
 			for _i in range(_bb_numrecs):
-				_ptr = self.in_fd.read(sizeof(xfs_bmbt_ptr))
-				_bmbt_ptr = New(_ptr, xfs_bmbt_ptr)
-				_bmbt_ptrs.append(copy.deepcopy(_bmbt_ptr))
+				_ptr = self.cache.read(_o, sizeof(xfs_bmbt_ptr))
+				_bmbt_ptrs.append(New(_ptr, xfs_bmbt_ptr))
 				_o += sizeof(xfs_bmbt_ptr)
 			for _i in range(_bb_numrecs):
-				_next_node_block = cpu_to_be64(_bmbt_ptrs[_i].value)
-				_ag_no = _next_node_block >> self.superblocks[0][0].sb_agblklog
-				_rel_mask = (1 << self.superblocks[_ag_no][0].sb_agblklog) -1
-				_rel_block = _next_node_block & _rel_mask
-				_o = (_ag_no * cpu_to_be32(self.superblocks[_ag_no][0].sb_agblocks) + _rel_block) * cpu_to_be32(self.superblocks[_ag_no][0].sb_blocksize)
-				self._set_btree_dir(_o, inode_core, parent_inumber, False, parent_path)
+				_o = self.geometry.fsb_to_offset(_bmbt_ptrs[_i].value)
+				self._set_btree_dir(_o, inode_core, parent_inumber, False)
 		else:
 			_data_fork_offset = _o
 			for _i in range(_bb_numrecs):
-				self._set_leaf_dir(_data_fork_offset,inode_core, parent_inumber, parent_path)
+				self._set_leaf_dir(_data_fork_offset,inode_core, parent_inumber)
 				_data_fork_offset += sizeof(xfs_bmbt_rec)
 
-	def _load_inode_detail(self, offset, inode_core, parent_inumber = -9, parent_path = ""):
+	def _load_inode_detail(self, offset, inode_core, parent_inumber = -9):
 
 		_data_fork_offset = offset + inode_core.size()
 		_data_fork_type = get_type(inode_core.di_mode)
-		self.in_fd.seek(_data_fork_offset)
 		if _data_fork_type == S_IFDIR:
 			if inode_core.di_format == xfs_dinode_fmt.XFS_DINODE_FMT_LOCAL:
-				self._set_short_form_dir(_data_fork_offset, parent_inumber, parent_path)
+				self._set_short_form_dir(_data_fork_offset, inode_core, parent_inumber)
 			elif inode_core.di_format == xfs_dinode_fmt.XFS_DINODE_FMT_EXTENTS:
-				self._set_block_dir(_data_fork_offset, inode_core, parent_inumber, parent_path)
+				self._set_block_dir(_data_fork_offset, inode_core, parent_inumber)
 			elif inode_core.di_format == xfs_dinode_fmt.XFS_DINODE_FMT_BTREE:
-				self._set_btree_dir(_data_fork_offset, inode_core, parent_inumber, True, parent_path)
+				self._set_btree_dir(_data_fork_offset, inode_core, parent_inumber, True)
 		else:
 			pass
 
 	def _get_inode_offset(self, inode):
 
-		_ag_no = inode >> (self.superblocks[0][0].sb_agblklog + self.superblocks[0][0].sb_inopblog)
-		if _ag_no > (len(self.superblocks) -1):
-			return None
-
-		_rel_mask = (1 << (self.superblocks[0][0].sb_agblklog + self.superblocks[0][0].sb_inopblog)) -1
-		_rel_inode = inode & _rel_mask
-		_rel_block = _rel_inode >> self.superblocks[0][0].sb_inopblog
-		_rel_block_rem_mask = (1 << self.superblocks[0][0].sb_inopblog) -1
-		_rel_offset = _rel_inode & _rel_block_rem_mask
-		_o = _ag_no * cpu_to_be32(self.superblocks[_ag_no][0].sb_agblocks) * cpu_to_be32(self.superblocks[_ag_no][0].sb_blocksize) \
-			+ _rel_block * cpu_to_be32(self.superblocks[_ag_no][0].sb_blocksize) \
-			+ _rel_offset * cpu_to_be16(self.superblocks[_ag_no][0].sb_inodesize)
-
-		return _o
+		return self.geometry.ino_to_offset(inode)
 
 	def _get_short_form_sl(self, i_num, inode_core):
 
-		_org = self.in_fd.tell()
 		_o = self._get_inode_offset(i_num) + inode_core.size()
-		self.in_fd.seek(_o)
-		_length = cpu_to_be64(inode_core.di_size)
+		_length = inode_core.di_size
 		try:
-			_name = self.in_fd.read(_length).decode('utf-8', errors='ignore').replace('\x00','')
+			_name = self.cache.read(_o, _length).decode('utf-8', errors='ignore').replace('\x00','')
 		except Exception as e:
 			_name = ""
 
-		self.in_fd.seek(_org)
-
 		return _name
 
 	def _get_block_sl(self, i_num, inode_core):
@@ -517,28 +388,29 @@ class XFS:
 	def _get_short_form_attr(self, i_num, inode_core):
 
 		_attrs = []
-		_org = self.in_fd.tell()
 		_o = self._get_inode_offset(i_num) + inode_core.size() + inode_core.di_forkoff * 8
-		self.in_fd.seek(_o)
-		_length = cpu_to_be64(inode_core.di_size)
+		_length = inode_core.di_size
 
-		_ptr = self.in_fd.read(sizeof(xfs_attr_sf_hdr))
-		_attr_sf_hdr = copy.deepcopy(New(_ptr, xfs_attr_sf_hdr))
-		_totsize = cpu_to_be16(_attr_sf_hdr.totsize)
+		_ptr = self.cache.read(_o, sizeof(xfs_attr_sf_hdr))
+		_o += sizeof(xfs_attr_sf_hdr)
+		_attr_sf_hdr = New(_ptr, xfs_attr_sf_hdr)
+		_totsize = _attr_sf_hdr.totsize
 		_count = _attr_sf_hdr.count
 		for _i in range(0, _count, 1):
-			_o = self.in_fd.tell()
-			_ptr = self.in_fd.read(sizeof(xfs_attr_sf_entry))
-			_attr_sf_entry = copy.deepcopy(New(_ptr, xfs_attr_sf_entry))
+			_ptr = self.cache.read(_o, sizeof(xfs_attr_sf_entry))
+			_attr_sf_entry = New(_ptr, xfs_attr_sf_entry)
 			_namelen = _attr_sf_entry.namelen
 			_valuelen = _attr_sf_entry.valuelen
 			_flags = _attr_sf_entry.flags
-			self.in_fd.seek(_o + xfs_attr_sf_entry.nameval.offset)
-			_name = self.in_fd.read(_namelen).decode('utf-8', errors='ignore').replace('\x00','')
+			_o += xfs_attr_sf_entry.nameval.offset
+			_name = self.cache.read(_o, _namelen).decode('utf-8', errors='ignore').replace('\x00','')
+			_o += _namelen
+			_v = self.cache.read(_o, _valuelen)
+			_o += _valuelen
 			try:
-				_value = self.in_fd.read(_valuelen).decode('utf-8').replace('\x00','').replace('"','""')
+				_value = _v.decode('utf-8').replace('\x00','').replace('"','""')
 			except:
-				_value = "0x" + self.in_fd.read(_valuelen).hex()
+				_value = "0x" + _v.hex()
 
 			_flags_str = ""
 			if _flags & XFS_ATTR_LOCAL:
@@ -565,68 +437,441 @@ class XFS:
 			_attr.append(_flags_str)
 			_attrs.append(_attr)
 
-		self.in_fd.seek(_org)
-		
 		return _attrs
 
-	def _set_first_inode(self, inode, inode_core):
+	def _get_first_inode(self, inode, inode_core):
 
 		inode_rec = InodeRec()
 		inode_rec.parent_inode_num = -9
-		inode_rec.inode_core = inode_core
 		inode_rec.name = "/"
 		inode_rec.parent_path = ""
 		inode_rec.inode_num = inode
 		inode_rec.ftype = ""
+		inode_rec.set_inode_core(inode_core)
+		if (self.inode_filter != None) and (not self.inode_filter.match(inode_rec)):
+			return None
 		_dft = get_type(inode_core.di_mode)
-		if _dft == S_IFLNK:
+		if (_dft == S_IFLNK) and self.want_sl_target:
 			if inode_core.di_format == xfs_dinode_fmt.XFS_DINODE_FMT_LOCAL:
 				inode_rec.sl_target = self._get_short_form_sl(inode, inode_core)
 			elif inode_core.di_format == xfs_dinode_fmt.XFS_DINODE_FMT_EXTENTS:
 				inode_rec.sl_target = self._get_block_sl(inode, inode_core)
-		if inode_core.di_aformat == 1:
+		if (inode_core.di_aformat == 1) and self.want_attrs:
 			inode_rec.attrs = self._get_short_form_attr(inode, inode_core)
 
-		self._put_inode_rec(copy.deepcopy(inode_rec))
+		return inode_rec
+
+	def _get_entry(self, inumber, name, ftype, parent_inumber, parent_path, is_deleted, offset, inode_core):
+
+		inode_rec = InodeRec()
+		inode_rec.parent_inode_num = parent_inumber
+		if offset != None:
+			inode_rec.inode_num = inumber
+		else:
+			inode_rec.inode_num = -1
+		inode_rec.name = name
+		inode_rec.parent_path = parent_path
+		inode_rec.ftype = XFS_DIR3_FT_NAMES.get(ftype, XFS_DIR3_FT_NAMES[0])
+		inode_rec.is_deleted = is_deleted
+
+		if inode_core != None:
+			inode_rec.set_inode_core(inode_core)
+		if (self.inode_filter != None) and (not self.inode_filter.match(inode_rec)):
+			return None
+
+		if inode_core != None:
+			_dft = get_type(inode_core.di_mode)
+			if (_dft == S_IFLNK) and self.want_sl_target:
+				if inode_core.di_format == xfs_dinode_fmt.XFS_DINODE_FMT_LOCAL:
+					inode_rec.sl_target = self._get_short_form_sl(inumber, inode_core)
+				elif inode_core.di_format == xfs_dinode_fmt.XFS_DINODE_FMT_EXTENTS:
+					inode_rec.sl_target = self._get_block_sl(inumber, inode_core)
+			if (inode_core.di_aformat == 1) and self.want_attrs:
+				inode_rec.attrs = self._get_short_form_attr(inumber, inode_core)
+
+		return inode_rec
+
+	def get_dir_path(self, inumber):
+
+		_path = self.dir_paths.get(inumber)
+		_chain = []
+		while _path == None:
+			_entry = self.dir_names.get(inumber)
+			if _entry == None:
+				return ""
+			_chain.append((inumber, _entry[1]))
+			inumber = _entry[0]
+			_path = self.dir_paths.get(inumber)
+		for _inumber, _name in reversed(_chain):
+			if _path == "/":
+				_path = _path + _name
+			else:
+				_path = _path + "/" + _name
+			self.dir_paths[_inumber] = _path
+		return _path
+
+	def _get_dir_extents(self, offset, inode_core):
+
+		if (get_type(inode_core.di_mode) != S_IFDIR) \
+			or (inode_core.di_format != xfs_dinode_fmt.XFS_DINODE_FMT_EXTENTS):
+			return []
+		_extents = []
+		_data_fork_offset = offset + inode_core.size()
+		_ptr = self.cache.read(_data_fork_offset, inode_core.di_nextents * sizeof(xfs_bmbt_rec))
+		for _i in range(len(_ptr) // sizeof(xfs_bmbt_rec)):
+			_extents.append(unpack_bmbt_rec(New(_ptr, xfs_bmbt_rec, _i * sizeof(xfs_bmbt_rec))))
+		return _extents
+
+	def _get_dir_block_ranges(self, offset, inode_core):
+
+		_ranges = []
+		for _bmbt_irec in self._get_dir_extents(offset, inode_core):
+			_ranges.append((self.geometry.fsb_to_offset(_bmbt_irec.br_startblock), \
+							_bmbt_irec.br_blockcount * self.geometry.blocksize))
+		return _ranges
+
+	def _dir_offset_to_physical(self, extents, dir_offset):
+
+		_bs = self.geometry.blocksize
+		_fsbno = dir_offset // _bs
+		for _bmbt_irec in extents:
+			if _bmbt_irec.br_startoff <= _fsbno < _bmbt_irec.br_startoff + _bmbt_irec.br_blockcount:
+				return self.geometry.fsb_to_offset(_bmbt_irec.br_startblock + _fsbno - _bmbt_irec.br_startoff) \
+						+ dir_offset % _bs
+		return None
+
+	def _hash_lookup(self, offset, inode_core, name):
+
+		_extents = self._get_dir_extents(offset, inode_core)
+		if len(_extents) == 0:
+			return None
+		_dbs = self.geometry.dirblksize
+		_leaf_block = self._dir_offset_to_physical(_extents, XFS_DIR2_LEAF_OFFSET)
+		if _leaf_block == None:
+			_o = self._dir_offset_to_physical(_extents, 0)
+			if _o == None:
+				return None
+			_blk = self.cache.read(_o, _dbs)
+			if len(_blk) < _dbs:
+				return None
+			if self.geometry.is_v5:
+				_magic = New(_blk, xfs_dir3_blk_hdr).magic
+			else:
+				_magic = New(_blk, xfs_dir2_data_hdr).magic
+			if (_magic != XFS_DIR2_BLOCK_MAGIC) and (_magic != XFS_DIR3_BLOCK_MAGIC):
+				return None
+			_dir2_block_tail = New(_blk, xfs_dir2_block_tail, _dbs - sizeof(xfs_dir2_block_tail))
+			_count = _dir2_block_tail.count
+			_leaf_o = _dbs - sizeof(xfs_dir2_block_tail) - _count * sizeof(xfs_dir2_leaf_entry)
+		else:
+			_blk = self.cache.read(_leaf_block, _dbs)
+			if self.geometry.is_v5:
+				_leaf_hdr = New(_blk, xfs_dir3_leaf_hdr)
+				_magic = _leaf_hdr.info.hdr.magic
+			else:
+				_leaf_hdr = New(_blk, xfs_dir2_leaf_hdr)
+				_magic = _leaf_hdr.info.magic
+			if (_magic != XFS_DIR2_LEAF1_MAGIC) and (_magic != XFS_DIR3_LEAF1_MAGIC):
+				return None
+			_count = _leaf_hdr.count
+			_leaf_o = sizeof(_leaf_hdr)
+		if (_leaf_o < 0) or (_leaf_o + _count * sizeof(xfs_dir2_leaf_entry) > len(_blk)):
+			return None
+
+		_name = name.encode("utf-8")
+		if self._m_features & XFS_FEAT_ASCIICI:
+			_hash = xfs_ascii_ci_hashname(_name)
+		else:
+			_hash = xfs_da_hashname(_name)
+		_lo = 0
+		_hi = _count
+		while _lo < _hi:
+			_mid = (_lo + _hi) // 2
+			if New(_blk, xfs_dir2_leaf_entry, _leaf_o + _mid * sizeof(xfs_dir2_leaf_entry)).hashval < _hash:
+				_lo = _mid + 1
+			else:
+				_hi = _mid
+		for _i in range(_lo, _count):
+			_leaf_entry = New(_blk, xfs_dir2_leaf_entry, _leaf_o + _i * sizeof(xfs_dir2_leaf_entry))
+			if _leaf_entry.hashval != _hash:
+				break
+			if _leaf_entry.address == XFS_DIR2_NULL_DATAPTR:
+				continue
+			_o = self._dir_offset_to_physical(_extents, _leaf_entry.address << XFS_DIR2_DATA_ALIGN_LOG)
+			if _o == None:
+				continue
+			_ptr = self.cache.read(_o, sizeof(c_uint64) + sizeof(c_uint8) + len(_name) + sizeof(c_uint8))
+			if len(_ptr) < sizeof(c_uint64) + sizeof(c_uint8) + len(_name):
+				continue
+			_inumber, _namelen = struct.unpack_from(">QB", _ptr)
+			if (_namelen != len(_name)) or (_ptr[9:9 + _namelen] != _name):
+				continue
+			_ftype = 0
+			if xfs_has_ftype(self._m_features) and (len(_ptr) > 9 + _namelen):
+				_ftype = _ptr[9 + _namelen]
+			return _inumber, _ftype
+		return False
+
+	def _walk_entries(self, entries, next_dirs):
+
+		_stopped = set()
+		for _k in range(0, len(entries), WALK_CHUNK_ENTRIES):
+			_chunk = entries[_k:_k + WALK_CHUNK_ENTRIES]
+			_cores = self._get_inode_cores(set(_e[0] for _e in _chunk))
+			for _inumber, _name, _ftype, _parent_inumber, _is_deleted, _group in _chunk:
+				if (_group != None) and (_group in _stopped):
+					continue
+				_offset, _inode_core = _cores.get(_inumber, (None, None))
+				if _offset == None:
+					if _group != None:
+						_stopped.add(_group)
+						continue
+					_is_deleted = True
+				_parent_path = ""
+				if self.resolve_paths:
+					_parent_path = self.get_dir_path(_parent_inumber)
+				_inode_rec = self._get_entry(_inumber, _name, _ftype, _parent_inumber, _parent_path, _is_deleted, _offset, _inode_core)
+				if _inode_rec != None:
+					yield _inode_rec
+				if _is_deleted or (get_type(_inode_core.di_mode) != S_IFDIR) \
+					or (_inumber in self.dir_names) or (_inumber in self.dir_paths):
+					continue
+				if (self.inode_filter != None) and (not self.inode_filter.may_contain(join_path(_parent_path, _name))):
+					continue
+				self.dir_names[_inumber] = (_parent_inumber, _name)
+				next_dirs.append((_offset, _inode_core, _inumber))
+
+	def _walk_dirs(self, dirs, split_at = None, max_levels = None):
+
+		_dirs = dirs
+		_level = 0
+		while len(_dirs) > 0:
+			if (max_levels != None) and (_level >= max_levels):
+				return
+			_level += 1
+			_dirs.sort(key = lambda _d: _d[0])
+			if (split_at != None) and (len(_dirs) >= split_at):
+				self.split_dirs = _dirs
+				return
+			_budget = min(self.cache.capacity * self.cache.block_size // 2, WALK_CHUNK_BYTES)
+			_next = []
+			_i = 0
+			while _i < len(_dirs):
+				_j = _i
+				_ranges = []
+				_total = 0
+				while (_j < len(_dirs)) and ((_j == _i) or ((_total < _budget) and (_j - _i < WALK_CHUNK_DIRS))):
+					for _r in self._get_dir_block_ranges(_dirs[_j][0], _dirs[_j][1]):
+						_ranges.append(_r)
+						_total += _r[1]
+					_j += 1
+				self.cache.load(_ranges)
+				self.pending_entries = []
+				for _o, _inode_core, _inumber in _dirs[_i:_j]:
+					self._load_inode_detail(_o, _inode_core, _inumber)
+				_entries = self.pending_entries
+				self.pending_entries = []
+				_dirs[_i:_j] = [None] * (_j - _i)
+				_i = _j
+				yield from self._walk_entries(_entries, _next)
+			_dirs = _next
+
+	def _walk_subtree(self, offset, inumber, path):
+
+		_ptr = self.cache.read(offset, sizeof(xfs_dinode))
+		_inode_core = New(_ptr, xfs_dinode)
+		if _inode_core.di_magic != XFS_DINODE_MAGIC:
+			return
+		self.dir_names = {}
+		self.dir_paths = {inumber: path}
+		yield from self._walk_dirs([(offset, _inode_core, inumber)])
 
-	def _load_inode(self, inode):
+	def _load_inode(self, inode, split_at = None):
 
 		_o = self._get_inode_offset(inode)
 		if _o == None:
 			return
 
-		self.in_fd.seek(_o)
-		_ptr = self.in_fd.read(sizeof(xfs_dinode))
-		inode_core = New(_ptr, xfs_dinode)
-		if cpu_to_be16(inode_core.di_magic) == XFS_DINODE_MAGIC:
-			_inode_core = copy.deepcopy(inode_core)
-			self._set_first_inode(inode, _inode_core)
-			self._load_inode_detail(_o, _inode_core, inode, "/")
+		_ptr = self.cache.read(_o, sizeof(xfs_dinode))
+		_inode_core = New(_ptr, xfs_dinode)
+		if _inode_core.di_magic == XFS_DINODE_MAGIC:
+			_inode_rec = self._get_first_inode(inode, _inode_core)
+			if _inode_rec != None:
+				yield _inode_rec
+			self.dir_names = {}
+			self.dir_paths = {inode: "/"}
+			yield from self._walk_dirs([(_o, _inode_core, inode)], split_at)
 
-	def _load_inodes(self):
+	def get_inode(self, inumber):
 
-		if self.first_inode_number:
-			_inode = self.first_inode_number
-		else:
-			return
+		_o, _inode_core = self._get_inode_core(inumber)
+		if _o == None:
+			return None
+		return self._get_entry(inumber, "", 0, -1, "", False, _o, _inode_core)
+
+	def list_dir(self, inumber, path = ""):
 
-		self._load_inode(_inode)
+		_o, _inode_core = self._get_inode_core(inumber)
+		if (_o == None) or (get_type(_inode_core.di_mode) != S_IFDIR):
+			return None
+		self.dir_names = {}
+		self.dir_paths = {inumber: path}
+		_inode_recs = []
+		for _inode_rec in self._walk_dirs([(_o, _inode_core, inumber)], max_levels = 1):
+			if _inode_rec.inode_num >= 0:
+				_inode_recs.append(_inode_rec)
+		return _inode_recs
+
+	def _find_dir_entry(self, inumber, path, name):
+
+		_o, _inode_core = self._get_inode_core(inumber)
+		if _o == None:
+			return None
+		_found = self._hash_lookup(_o, _inode_core, name)
+		if _found == False:
+			return None
+		if _found != None:
+			_inumber, _ftype = _found
+			_co, _core = self._get_inode_core(_inumber)
+			if _co == None:
+				return None
+			return self._get_entry(_inumber, name, _ftype, inumber, path, False, _co, _core)
+
+		_inode_recs = self.list_dir(inumber, path)
+		if _inode_recs == None:
+			return None
+		for _inode_rec in _inode_recs:
+			if (_inode_rec.name == name) and (not _inode_rec.is_deleted):
+				return _inode_rec
+		return None
+
+	def _resolve(self, path):
+
+		if not self.first_inode_number:
+			return None
+		_names = []
+		for _name in path.split("/"):
+			if (_name == "") or (_name == "."):
+				continue
+			if _name == "..":
+				if len(_names) > 0:
+					_names.pop()
+				continue
+			_names.append(_name)
+
+		_inode_filter = self.inode_filter
+		self.inode_filter = None
+		try:
+			_inumber = self.first_inode_number
+			_path = "/"
+			_inode_rec = None
+			for _name in _names:
+				_inode_rec = self._find_dir_entry(_inumber, _path, _name)
+				if _inode_rec == None:
+					return None
+				_inumber = _inode_rec.inode_num
+				_path = join_path(_path, _name)
+			if _inode_rec == None:
+				_o, _inode_core = self._get_inode_core(_inumber)
+				if _o == None:
+					return None
+				_inode_rec = self._get_first_inode(_inumber, _inode_core)
+		finally:
+			self.inode_filter = _inode_filter
+		return _inode_rec
+
+	def lookup(self, path):
+
+		_inode_rec = self._resolve(path)
+		if (_inode_rec == None) or (self.inode_filter == None) or self.inode_filter.match(_inode_rec):
+			return _inode_rec
+		return None
+
+	def get_log_rows(self):
+
+		if self.log_rows == None:
+			_out = self.out
+			self.out = MemoryWriter()
+			try:
+				self.search_logs()
+				self.log_rows = self.out.rows
+			finally:
+				self.out = _out
+		return self.log_rows
 
 	def _set_inode_range(self):
 
 		if len(self.superblocks) == 0:
 			return
 
-		self.first_inode_number = cpu_to_be64(self.superblocks[0][0].sb_rootino)
-		_max_inum = 0
-		for _i in range(len(self.superblocks) - 1):
-			_max_inum += 1 << self.superblocks[_i][0].sb_agblklog + self.superblocks[_i][0].sb_inopblog
+		self.first_inode_number = self.geometry.rootino
+		_max_inum = (self.geometry.agcount - 1) << self.geometry.agino_log
 
 		self.last_inode_number = _max_inum \
-								+ cpu_to_be32(self.ag_inode_b_plus_tree_info[len(self.ag_inode_b_plus_tree_info) -  1][1].agi_length) \
-								* cpu_to_be16(self.superblocks[len(self.superblocks) - 1][0].sb_inopblock) \
+								+ self.ag_inode_b_plus_tree_info[len(self.ag_inode_b_plus_tree_info) -  1][1].agi_length \
+								* self.geometry.inopblock \
 								- 1
 
+	def _get_inobt_recs(self, ag_no, agi):
+
+		_recs = []
+		_bs = self.geometry.blocksize
+		_agb_base = ag_no * self.geometry.agblocks
+		_visited = set()
+		_blocks = [agi.agi_root]
+		while len(_blocks) > 0:
+			_agbno = _blocks.pop()
+			if (_agbno in _visited) or (_agbno >= self.geometry.agblocks):
+				continue
+			_visited.add(_agbno)
+			_blk = self.cache.read((_agb_base + _agbno) * _bs, _bs)
+			if len(_blk) < _bs:
+				continue
+			_inobt_block = New(_blk, xfs_inobt_block)
+			if (_inobt_block.bb_magic != XFS_IBT_MAGIC) and (_inobt_block.bb_magic != XFS_IBT_CRC_MAGIC):
+				continue
+			_o = _inobt_block.size()
+			if _inobt_block.bb_level > 0:
+				_maxrecs = (_bs - _o) // (sizeof(xfs_inobt_key) + sizeof(xfs_inobt_ptr))
+				_o += _maxrecs * sizeof(xfs_inobt_key)
+				_ptrs = []
+				for _i in range(min(_inobt_block.bb_numrecs, _maxrecs)):
+					_ptrs.append(New(_blk, xfs_inobt_ptr, _o + _i * sizeof(xfs_inobt_ptr)).value)
+				_blocks.extend(reversed(_ptrs))
+			else:
+				_maxrecs = (_bs - _o) // sizeof(xfs_inobt_rec)
+				for _i in range(min(_inobt_block.bb_numrecs, _maxrecs)):
+					_recs.append(New(_blk, xfs_inobt_rec, _o + _i * sizeof(xfs_inobt_rec)))
+
+		return _recs
+
+	def _load_inode_chunks(self, ag_no, agi):
+
+		_isize = self.geometry.inodesize
+		_chunk_buf = bytearray(XFS_INODES_PER_CHUNK * _isize)
+		for _inobt_rec in self._get_inobt_recs(ag_no, agi):
+			_first = (ag_no << self.geometry.agino_log) | _inobt_rec.ir_startino
+			_o = self.geometry.ino_to_offset(_first)
+			if _o == None:
+				continue
+			_chunk = memoryview(_chunk_buf)[:self.image.readinto(_o, _chunk_buf)]
+			for _i in range(XFS_INODES_PER_CHUNK):
+				if _inobt_rec.ir_holemask & (1 << (_i // XFS_INODES_PER_HOLEMASK_BIT)):
+					continue
+				_is_free = ((_inobt_rec.ir_free >> _i) & 1) == 1
+				if _is_free and (not self.deleted):
+					continue
+				if (_i + 1) * _isize > len(_chunk):
+					break
+				_inode_core = New(_chunk, xfs_dinode, _i * _isize)
+				if _inode_core.di_magic != XFS_DINODE_MAGIC:
+					continue
+				if _is_free and (_inode_core.di_mode == 0):
+					continue
+				_inode_rec = self._get_entry(_first + _i, "", 0, -1, "", _is_free, _o + _i * _isize, _inode_core)
+				if _inode_rec != None:
+					yield _inode_rec
+
 	def _set_inode_b_plus_tree_info(self):
 
 		self.ag_inode_b_plus_tree_info = []
@@ -634,12 +879,11 @@ class XFS:
 		_o = 0
 		for _sb in self.superblocks:
 			_o = _sb[1]
-			_o += cpu_to_be16(_sb[0].sb_sectsize) * 2
-			self.in_fd.seek(_o)
-			_ptr = self.in_fd.read(sizeof(xfs_agi))
+			_o += _sb[0].sb_sectsize * 2
+			_ptr = self.image.read(_o, sizeof(xfs_agi))
 			agi = New(_ptr, xfs_agi)
-			if cpu_to_be32(agi.agi_magicnum) == XFS_AGI_MAGIC:
-				self.ag_inode_b_plus_tree_info.append((cpu_to_be32(agi.agi_seqno), copy.deepcopy(agi)))
+			if agi.agi_magicnum == XFS_AGI_MAGIC:
+				self.ag_inode_b_plus_tree_info.append((agi.agi_seqno, agi))
 
 	def _set_superblocks(self):
 
@@ -647,36 +891,36 @@ class XFS:
 		_p = []
 		_o = 0
 		while True:
-			self.in_fd.seek(_o)
-			_ptr = self.in_fd.read(sizeof(xfs_sb))
-			sb = New(_ptr, xfs_sb)
-			if cpu_to_be32(sb.sb_magicnum) != XFS_SB_MAGIC:
+			_ptr = self.image.read(_o, sizeof(xfs_sb))
+			if len(_ptr) < sizeof(xfs_sb):
+				sb = xfs_sb()
+			else:
+				sb = New(_ptr, xfs_sb)
+			if sb.sb_magicnum != XFS_SB_MAGIC:
 				if len(self.superblocks) == 0:
 					print("target is not XFS", file=sys.stderr)
 					sys.exit(-1)
 				break
 
-			_bs = cpu_to_be32(sb.sb_blocksize)
-			self.superblocks.append((copy.deepcopy(sb), _o, _bs))
-			_o += cpu_to_be32(sb.sb_blocksize) * cpu_to_be32(sb.sb_agblocks)
+			_bs = sb.sb_blocksize
+			self.superblocks.append((sb, _o, _bs))
+			_o += sb.sb_blocksize * sb.sb_agblocks
 
 		_m_features = xfs_sb_version_to_features(self.superblocks[0][0])
 		self._m_features = _m_features
+		self.geometry = Geometry(self.superblocks[0][0], len(self.superblocks))
 
 	def _put_journal_header(self):
 
-		print("%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s" \
+		self.out.put("%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s" \
 				% \
 				("tid", "item_no", "type", "affected", "inode", "name", "mode", \
 				"uid", "gid", "size", "atime", "mtime", "ctime", "crtime", "xfs_dir3_ft", \
-				"di_mode_ft", "parent_inode", "extra"), file = self.out_fd)
+				"di_mode_ft", "parent_inode", "extra"))
 
 	def _get_inode_number(self, ag_no, agbno, isize):
 
-		_inode = (ag_no << (self.superblocks[ag_no][0].sb_agblklog + self.superblocks[ag_no][0].sb_inopblog)) \
-			+ (agbno << self.superblocks[ag_no][0].sb_inopblog) \
-			+ isize // cpu_to_be16(self.superblocks[ag_no][0].sb_inodesize)
-		return _inode
+		return self.geometry.agb_to_ino(ag_no, agbno, isize)
 
 	def _xlog_buf_bbcount_valid(self, bbcount):
 		return (bbcount > 0) and bbcount <= self._logBBsize
@@ -690,16 +934,40 @@ class XFS:
 	def _round_up(self, x, y):
 		return ((((x)-1) | self._round_mask(x, y))+1)
 
+	def _xlog_read(self, offset, size):
+
+		_o = offset - self._log_offset
+		if (_o < 0) or (size <= 0):
+			return b""
+		return bytearray(self.log_buf[_o:_o + size])
+
+	def _xlog_get_cycles(self):
+
+		if self.log_cycles != None:
+			return self.log_cycles
+		_words = self.log_buf[:len(self.log_buf) & ~(BBSIZE - 1)].cast("I")
+		_first = bytes(_words[0::BBSIZE // 4])
+		_cycles = array.array("I", _first)
+		if sys.byteorder == "little":
+			_cycles.byteswap()
+		_magic = XLOG_HEADER_MAGIC.to_bytes(4, "big")
+		_pos = _first.find(_magic)
+		while _pos != -1:
+			if _pos % 4 == 0:
+				_cycles[_pos // 4], = struct.unpack_from(">I", self.log_buf, _pos * (BBSIZE // 4) + 4)
+				_pos = _first.find(_magic, _pos + 4)
+			else:
+				_pos = _first.find(_magic, _pos + 1)
+		self.log_cycles = _cycles
+		return _cycles
+
 	def _xlog_get_cycle(self, offset):
 
-		self.in_fd.seek(offset)
-		_ptr = self.in_fd.read(sizeof(xlog_rec_header))
-		_rec_header = copy.deepcopy(New(_ptr, xlog_rec_header))
-		if cpu_to_be32(_rec_header.h_magicno) == XLOG_HEADER_MAGIC:
-			_cycle = cpu_to_be32(_rec_header.h_cycle)
-		else:
-			_cycle = cpu_to_be32(_rec_header.h_magicno)
-		return _cycle
+		_blk = (offset - self._log_offset) >> BBSHIFT
+		_cycles = self._xlog_get_cycles()
+		if (_blk < 0) or (_blk >= len(_cycles)):
+			return 0
+		return _cycles[_blk]
 
 	def _xlog_bread_noalign(self, blk_no, nbblks):
 
@@ -730,13 +998,11 @@ class XFS:
 
 	def _xlog_find_cycle_start(self, first_blk, last_blk, cycle):
 
+		_cycles = self._xlog_get_cycles()
 		end_blk = last_blk
 		mid_blk = BLK_AVG(first_blk, end_blk)
 		while (mid_blk != first_blk) and (mid_blk != end_blk):
-			_err, _o = self._xlog_bread(mid_blk, 1)
-			if _err:
-				return _err, None
-			mid_cycle = self._xlog_get_cycle(_o)
+			mid_cycle = _cycles[mid_blk] if mid_blk < len(_cycles) else 0
 			if mid_cycle == cycle:
 				end_blk = mid_blk
 			else:
@@ -747,22 +1013,13 @@ class XFS:
 
 	def _xlog_find_verify_cycle(self, start_blk, nbblks, stop_on_cycle_no):
 
-		bufblks = self._logBBsize
-		new_blk = -9
-		for _i in range(start_blk, start_blk + nbblks, bufblks):
-			bcount = min(bufblks, (start_blk + nbblks - _i))
-			_err, _o = self._xlog_bread(_i, bcount)
-			if _err:
-				return _err, new_blk
-			for _j in range(0, bcount, 1):
-				cycle = self._xlog_get_cycle(_o)
-				if cycle == stop_on_cycle_no:
-					new_blk = _i + _j
-					return _err, new_blk
-				_o += BBSIZE
-		new_blk = -1
-
-		return _err, new_blk
+		_cycles = self._xlog_get_cycles()
+		try:
+			new_blk = start_blk + _cycles[start_blk:start_blk + nbblks].index(stop_on_cycle_no)
+		except ValueError:
+			new_blk = -1
+
+		return 0, new_blk
 
 	def _xlog_header_check_mount(self, head):
 
@@ -787,10 +1044,9 @@ class XFS:
 			_j = _i
 			if _i < start_blk:
 				return _err, -9
-			self.in_fd.seek(_o)
-			_ptr = self.in_fd.read(sizeof(xlog_rec_header))
-			_rec_header = copy.deepcopy(New(_ptr, xlog_rec_header))
-			if cpu_to_be32(_rec_header.h_magicno) == XLOG_HEADER_MAGIC:
+			_ptr = self._xlog_read(_o, sizeof(xlog_rec_header))
+			_rec_header = New(_ptr, xlog_rec_header)
+			if _rec_header.h_magicno == XLOG_HEADER_MAGIC:
 				break
 			_o -= BBSIZE
 
@@ -801,13 +1057,13 @@ class XFS:
 		if _err:
 			return _err
 		if xfs_has_logv2(self._m_features):
-			h_size = cpu_to_be32(_rec_header.h_size)
+			h_size = _rec_header.h_size
 			xhdrs = h_size // XLOG_HEADER_CYCLE_SIZE
 			if h_size % XLOG_HEADER_CYCLE_SIZE:
 				xhdrs +=1
 		else:
 			xhdrs = 1
-		if (last_blk - _j + extra_bblks) != (BTOBB(cpu_to_be32(_rec_header.h_len))+ xhdrs):
+		if (last_blk - _j + extra_bblks) != (BTOBB(_rec_header.h_len)+ xhdrs):
 			last_blk = _j
 
 		return 0, last_blk
@@ -883,16 +1139,16 @@ class XFS:
 
 	def _xlog_proc_rec_head(self, rec_header, length):
 
-		if not cpu_to_be32(rec_header.h_magicno):
+		if not rec_header.h_magicno:
 			return ZEROED_LOG, length
-		if cpu_to_be32(rec_header.h_magicno) != XLOG_HEADER_MAGIC:
+		if rec_header.h_magicno != XLOG_HEADER_MAGIC:
 			return BAD_HEADER, length
 
-		_h_len = cpu_to_be32(rec_header.h_len)
-		_h_crc = cpu_to_le32(rec_header.h_crc)
-		_h_prev_block = cpu_to_be32(rec_header.h_prev_block)
-		_h_num_logops = cpu_to_be32(rec_header.h_num_logops)
-		_h_size = cpu_to_be32(rec_header.h_size)
+		_h_len = rec_header.h_len
+		_h_crc = rec_header.h_crc
+		_h_prev_block = rec_header.h_prev_block
+		_h_num_logops = rec_header.h_num_logops
+		_h_size = rec_header.h_size
 		if (not _h_len) and (not _h_crc) and (not _h_prev_block) and (not _h_num_logops) and (not _h_size):
 			return CLEARED_BLKS, length
 
@@ -902,8 +1158,7 @@ class XFS:
 
 		_ret_xhdrs = []
 		for _i in range((num_hdrs - 1)):
-			_ext = xlog_rec_ext_header()
-			_ret_xhdrs.append(copy.deepcopy(_ext))
+			_ret_xhdrs.append(xlog_rec_ext_header())
 		return _ret_xhdrs
 
 	def _xlog_proc_extended_headers(self, length, blkno, hdr, ret_num_hdrs, ret_xhdrs):
@@ -914,8 +1169,8 @@ class XFS:
 		_ret_xhdrs = ret_xhdrs
 		_coverage_bb = 0
 		_num_required = howmany(length, XLOG_HEADER_CYCLE_SIZE)
-		_num_hdrs = cpu_to_be32(hdr.h_size) // XLOG_HEADER_CYCLE_SIZE
-		if (cpu_to_be32(hdr.h_size) % XLOG_HEADER_CYCLE_SIZE):
+		_num_hdrs = hdr.h_size // XLOG_HEADER_CYCLE_SIZE
+		if (hdr.h_size % XLOG_HEADER_CYCLE_SIZE):
 			_num_hdrs += 1
 		if _num_required > _num_hdrs:
 			sys.exit(-1)
@@ -929,13 +1184,12 @@ class XFS:
 
 		_ret_num_hdrs = _num_hdrs
 		for _i in range(1, _num_hdrs, 1):
-			if (self.cur_pos + 512) > self.in_f_size:
+			if (self.cur_pos + 512) > self._log_end:
 				_r = 1
 				return _r, _blkno, _ret_xhdrs, _ret_num_hdrs
 			else:
-				self.in_fd.seek(self.cur_pos)
-				_ptr = self.in_fd.read(sizeof(xlog_rec_ext_header))
-				_rec_ext_header = copy.deepcopy(New(_ptr, xlog_rec_ext_header))
+				_ptr = self._xlog_read(self.cur_pos, sizeof(xlog_rec_ext_header))
+				_rec_ext_header = New(_ptr, xlog_rec_ext_header)
 				self.cur_pos += 512
 			if _i == (_num_hdrs - 1):
 				_coverage_bb = BTOBB(length) % (XLOG_HEADER_CYCLE_SIZE // BBSIZE)
@@ -950,49 +1204,126 @@ class XFS:
 
 		return _r, _blkno, _ret_xhdrs, _ret_num_hdrs
 
-	def _xlog_proc_find_tid(self, tid, was_cont):
+	def _xlog_split_add(self, item, op_head, data, label):
 
-		_listp = self.split_list
-		if not _listp:
-			if was_cont != 0:
+		_ops, _continuing = item
+		if _continuing and (op_head.oh_flags & XLOG_WAS_CONT_TRANS) and (len(_ops) > 0):
+			_clientid, _flags, _data, _label = _ops[-1]
+			_ops = _ops[:-1] + ((_clientid, _flags, _data + bytes(data), _label),)
+		else:
+			_ops = _ops + ((op_head.oh_clientid, op_head.oh_flags, bytes(data), label),)
+		return _ops, (op_head.oh_flags & XLOG_CONTINUE_TRANS) != 0
+
+	def _xlog_split_complete(self, item):
+
+		_ops, _continuing = item
+		if _continuing or (len(_ops) == 0):
+			return False
+		_type, _size = struct.unpack_from("=HH", _ops[0][2].ljust(4, b"\x00"))
+		if (_type != XFS_LI_INODE) and (_type != XFS_LI_BUF):
+			_size = 1
+		return len(_ops) >= _size
+
+	def _xlog_proc_split_item(self, tid, ops):
+
+		_buf = bytearray()
+		for _clientid, _flags, _data, _label in ops:
+			_op_head = xlog_op_header()
+			_op_head.oh_tid = tid
+			_op_head.oh_len = len(_data)
+			_op_head.oh_clientid = _clientid
+			_op_head.oh_flags = _flags & ~(XLOG_CONTINUE_TRANS | XLOG_WAS_CONT_TRANS)
+			_buf += bytes(_op_head)
+			_buf += _data
+
+		_capture = self.log_capture
+		self.log_capture = []
+		self.log_joining += 1
+		try:
+			self._xlog_proc_ops(_buf, len(ops))
+			_rows = self.log_capture
+		finally:
+			self.log_capture = _capture
+			self.log_joining -= 1
+
+		for _tid, _row in _rows:
+			_tid_str, _item_no, _rest = _row.split(",", 2)
+			_k = int(_item_no.split("/")[0])
+			if _k < len(ops):
+				_row = "%s,%d/%d,%s" % (_tid_str, ops[_k][3][0], ops[_k][3][1], _rest)
+			self._xlog_put(_tid, _row)
+
+	def _xlog_flush_split(self, tid = None):
+
+		_tids = list(self.split_trans)
+		if tid != None:
+			_tids = [tid] if tid in self.split_trans else []
+		for _tid in _tids:
+			_ops, _continuing = self.split_trans.pop(_tid)
+			self._xlog_proc_split_item(_tid, _ops)
+
+	def _xlog_proc_find_tid(self, op_head, data, label):
+
+		_item = self.split_trans.get(op_head.oh_tid)
+		if _item == None:
+			if op_head.oh_flags & XLOG_WAS_CONT_TRANS:
 				return 1
-			else:
-				return 0
-
-		while _listp:
-			if _listp.si_xtid == tid:
-				break
-			_listp = _listp.si_next
-
-		if not _listp:
 			return 0
 
-		_listp.si_skip -= 1
-		if _listp.si_skip == 0:
-			self.split_list = _listp.si_next
-			if self.split_list:
-				split_list.si_prev = None
+		_item = self._xlog_split_add(_item, op_head, data, label)
+		if self._xlog_split_complete(_item):
+			del self.split_trans[op_head.oh_tid]
+			self._xlog_proc_split_item(op_head.oh_tid, _item[0])
 		else:
-			if _listp.si_next:
-				_listp.si_next.si_prev = _listp.si_prev
-				_listp.si_prev.si_next = _listp.si_next
+			self.split_trans[op_head.oh_tid] = _item
 
 		return 1
 
-	def _xlog_proc_add_to_trans(self, tid, skip):
+	def _xlog_proc_add_to_trans(self, ptr, first, last, num_ops, tid):
+
+		_item = ((), False)
+		_ptr = ptr
+		for _k in range(first, min(last + 1, num_ops)):
+			_op_head = New(_ptr, xlog_op_header)
+			_end = sizeof(xlog_op_header) + _op_head.oh_len
+			if (_op_head.oh_tid == tid) and (_op_head.oh_len != 0):
+				_item = self._xlog_split_add(_item, _op_head, _ptr[sizeof(xlog_op_header):_end], (_k, num_ops))
+			_ptr = _ptr[_end:]
+		if self._xlog_split_complete(_item):
+			return False
+
+		self._xlog_flush_split(tid)
+		self.split_trans[tid] = _item
+		return True
+
+	def _xlog_put(self, tid, row):
+
+		if self.log_capture != None:
+			self.log_capture.append((tid, row))
+		elif self.log_events != None:
+			self.log_events.append((tid, row))
+		elif self.log_trans != None:
+			self.log_trans.setdefault(tid, []).append(row)
+		else:
+			self.out.put(row)
+
+	def _xlog_commit(self, tid):
+
+		if self.log_events != None:
+			self.log_events.append((tid, None))
+		elif self.log_trans != None:
+			for _row in self.log_trans.pop(tid, []):
+				self.out.put(_row)
 
-		_item = xlog_split_item()
-		_item.si_xtid = tid
-		_item.si_skip = skip
-		_item.si_next = self.split_list
-		_item.si_prev = None
-		if self.split_list:
-			split_list.si_prev = _item
+	def _xlog_flush_trans(self):
 
-		self.split_list = _item
+		if self.log_trans == None:
+			return
+		for _tid in list(self.log_trans):
+			self._xlog_commit(_tid)
 
 	def _xfs_dir2_data_unused_tag_p(self, length):
-		_pos = cpu_to_be16(length) - sizeof(c_int16)
+		_pos = length - sizeof(c_int16)
 		return _pos
 
 	def _xfs_dir2_data_entsize(self, n):
@@ -1024,7 +1355,7 @@ class XFS:
 
 	def _xfs_dir2_sf_get_ino(self, ptr, dir2_sf_hdr):
 
-		_dir2_sf_entry = copy.deepcopy(New(ptr, xfs_dir2_sf_entry))
+		_dir2_sf_entry = New(ptr, xfs_dir2_sf_entry)
 		_pos = xfs_dir2_sf_entry.offset.offset + sizeof(xfs_dir2_sf_off) + _dir2_sf_entry.namelen
 		if xfs_has_ftype(self._m_features):
 			_pos += sizeof(c_uint8)
@@ -1041,13 +1372,13 @@ class XFS:
 
 		ptr = ptr[sizeof(xlog_op_header):]
 		if self.trans:
-			print("%04d)\t%d/%d, 0x%x(%d), 0x%x" % (sys._getframe(1).f_lineno, idx, num_ops, cpu_to_be32(op_head.oh_len), cpu_to_be32(op_head.oh_len), cpu_to_be32(op_head.oh_tid)), file = sys.stdout)
+			print("%04d)\t%d/%d, 0x%x(%d), 0x%x" % (sys._getframe(1).f_lineno, idx, num_ops, op_head.oh_len, op_head.oh_len, op_head.oh_tid), file = sys.stdout)
 
 		return ptr
 
 	def _xlog_proc_trans_header(self, ptr, length):
 
-		_trans_header = copy.deepcopy(New(ptr, xfs_trans_header))
+		_trans_header = New(ptr, xfs_trans_header)
 		if length != sizeof(xfs_trans_header):
 			return -1, ptr
 
@@ -1057,10 +1388,7 @@ class XFS:
 
 	def _xlog_proc_record(self, num_ops, length, partial_buf, rec_header, xhdrs, read_type, first_hdr_found):
 
-		_buf = None
 		_r = 0
-		_lost_context = 0
-		_skip = 0
 		if not length:
 			return NO_ERROR, read_type, partial_buf
 
@@ -1071,12 +1399,11 @@ class XFS:
 		else:
 			read_len -= read_type
 
-		self.in_fd.seek(self.cur_pos)
-		_ptr = self.in_fd.read(read_len)
-		_r = read_len
+		_ptr = self._xlog_read(self.cur_pos, read_len)
+		_r = len(_ptr)
 		self.cur_pos += read_len
-		if (read_type == FULL_READ) and ((BLOCK_LSN(cpu_to_be64(rec_header.h_lsn)) + BTOBB(read_len)) >= self._logBBsize):
-			read_type = BBTOB(self._logBBsize - BLOCK_LSN(cpu_to_be64(rec_header.h_lsn)) -1)
+		if (read_type == FULL_READ) and ((BLOCK_LSN(rec_header.h_lsn) + BTOBB(read_len)) >= self._logBBsize):
+			read_type = BBTOB(self._logBBsize - BLOCK_LSN(rec_header.h_lsn) -1)
 			partial_buf = _ptr
 			return PARTIAL_READ, read_type, partial_buf
 		if (_r == 0 and read_len != 0) or (_r != read_len):
@@ -1091,59 +1418,119 @@ class XFS:
 		if partial_buf != None:
 			_ptr = partial_buf[0:read_type] + _ptr
 
+		_bbs_per_hdr = XLOG_HEADER_CYCLE_SIZE // BBSIZE
+		_ptr.extend(bytes(max(0, read_len - len(_ptr))))
 		for _off in range(0, read_len, BBSIZE):
-			_rh = _ptr[_off:]
-			_rechead = copy.deepcopy(New(_rh, xlog_rec_header))
-			if cpu_to_be32(_rechead.h_magicno) == XLOG_HEADER_MAGIC:
+			_cycle, = struct.unpack_from(">I", _ptr, _off)
+			if _cycle == XLOG_HEADER_MAGIC:
 				return BAD_HEADER, read_type, partial_buf
+			if rec_header.h_cycle != _cycle:
+				if (read_type == FULL_READ) or ((rec_header.h_cycle + 1) != _cycle):
+					return BAD_HEADER, read_type, partial_buf
+			if _i < _bbs_per_hdr:
+				_data = rec_header.h_cycle_data[_i]
 			else:
-				_su = copy.deepcopy(New(_rh, sig_union))
-				if cpu_to_be32(rec_header.h_cycle) != cpu_to_be32(_su.sig32):
-					if (read_type == FULL_READ) or ((cpu_to_be32(rec_header.h_cycle) + 1) != cpu_to_be32(_su.sig32)):
-						return BAD_HEADER, read_type, partial_buf
-			if _i < XLOG_HEADER_CYCLE_SIZE // BBSIZE:
-				_ptr = _ptr[0:_off] + rec_header.h_cycle_data[_i].to_bytes(4, sys.byteorder) + _ptr[_off+4:]
-			else:
-				_j = _i // (XLOG_HEADER_CYCLE_SIZE // BBSIZE)
-				_k = _i % (XLOG_HEADER_CYCLE_SIZE // BBSIZE)
-				_ptr = _ptr[0:_off] + xhdrs[_j-1].xh_cycle_data[_k].to_bytes(4, sys.byteorder) + _ptr[_off+4:]
+				_data = xhdrs[_i // _bbs_per_hdr - 1].xh_cycle_data[_i % _bbs_per_hdr]
+			struct.pack_into(">I", _ptr, _off, _data)
 
 			_i += 1
 
+		self._xlog_queue_record(num_ops, _ptr)
+
+		return NO_ERROR, read_type, partial_buf
+
+	def _xlog_proc_ops(self, ptr, num_ops):
+
+		_lost_context = 0
+		_skip = 0
+		_ptr = memoryview(ptr)
 		_i = 0
 		while _i < num_ops:
-			_op_head = copy.deepcopy(New(_ptr, xlog_op_header))
+			_op_start = _ptr
+			_op_head = New(_ptr, xlog_op_header)
 			_ptr = self._xlog_proc_op_header(_ptr, _i, num_ops, _op_head)
 			_continued = ((_op_head.oh_flags & XLOG_WAS_CONT_TRANS) or (_op_head.oh_flags & XLOG_CONTINUE_TRANS))
-			if _continued and cpu_to_be32(_op_head.oh_len) == 0:
+			if _op_head.oh_flags & XLOG_COMMIT_TRANS:
+				self._xlog_flush_split(_op_head.oh_tid)
+				self._xlog_commit(_op_head.oh_tid)
+			if _continued and _op_head.oh_len == 0:
 				continue
-			if self._xlog_proc_find_tid(cpu_to_be32(_op_head.oh_tid), _op_head.oh_flags & XLOG_WAS_CONT_TRANS):
-				_ptr = _ptr[cpu_to_be32(_op_head.oh_len):]
+			if self._xlog_proc_find_tid(_op_head, _ptr[:_op_head.oh_len], (_i, num_ops)):
+				_ptr = _ptr[_op_head.oh_len:]
 				_lost_context = 1
 				_i += 1
 				continue
-			if cpu_to_be32(_op_head.oh_len) != 0:
-				_su = copy.deepcopy(New(_ptr, sig_union))
+			if _op_head.oh_len != 0:
+				_su = New(_ptr, sig_union)
 				if _su.sig32 == XFS_TRANS_HEADER_MAGIC:
-					_skip, _ptr = self._xlog_proc_trans_header(_ptr, cpu_to_be32(_op_head.oh_len))
+					_skip, _ptr = self._xlog_proc_trans_header(_ptr, _op_head.oh_len)
 				else:
+					_capture = self.log_capture
+					self.log_capture = []
+					_first = _i
 					if _su.sig16 == XFS_LI_INODE:
-						_skip, _i, _ptr = self._xlog_proc_trans_inode(_ptr, cpu_to_be32(_op_head.oh_len), _i, num_ops, _continued, _op_head)
+						_skip, _i, _ptr = self._xlog_proc_trans_inode(_ptr, _op_head.oh_len, _i, num_ops, _continued, _op_head)
 					elif _su.sig16 == XFS_LI_BUF:
-						_skip, _i, _ptr = self._xlog_proc_trans_buffer(_ptr, cpu_to_be32(_op_head.oh_len), _i, num_ops)
+						_skip, _i, _ptr = self._xlog_proc_trans_buffer(_ptr, _op_head.oh_len, _i, num_ops)
 					elif _su.sig16 == XFS_LI_ICREATE:
-						_skip, _i, _ptr = self._xlog_proc_trans_icreate(_ptr, cpu_to_be32(_op_head.oh_len), _op_head, _i, num_ops)
+						_skip, _i, _ptr = self._xlog_proc_trans_icreate(_ptr, _op_head.oh_len, _op_head, _i, num_ops)
 					elif _su.sig16 == XLOG_UNMOUNT_TYPE:
 						_skip = 0
 					else:
 						_skip = 0
-						_ptr = _ptr[cpu_to_be32(_op_head.oh_len):]
+						_ptr = _ptr[_op_head.oh_len:]
 						_lost_context = 0
-				if _skip != 0:
-					self._xlog_proc_add_to_trans(cpu_to_be32(_op_head.oh_tid), _skip)
+					_rows = self.log_capture
+					self.log_capture = _capture
+					if (_skip > 0) and (self.log_joining == 0) \
+						and self._xlog_proc_add_to_trans(_op_start, _first, _i, num_ops, _op_head.oh_tid):
+						_rows = []
+					for _tid, _row in _rows:
+						self._xlog_put(_tid, _row)
 			_i += 1
 
-		return NO_ERROR, read_type, partial_buf
+	def _xlog_get_split_state(self):
+		return dict(self.split_trans)
+
+	def _xlog_set_split_state(self, state):
+		self.split_trans = dict(state)
+
+	def _xlog_queue_record(self, num_ops, ptr):
+
+		if self.log_pool == None:
+			self._xlog_proc_ops(ptr, num_ops)
+			return
+		self.log_batch.append((num_ops, ptr))
+		self.log_batch_size += len(ptr)
+		if self.log_batch_size >= LOG_BATCH_SIZE:
+			self._xlog_submit_batch()
+
+	def _xlog_submit_batch(self):
+
+		if len(self.log_batch) > 0:
+			_async = self.log_pool.apply_async(_log_worker, (self.log_batch,))
+			self.log_pending.append((self.log_batch, _async))
+			self.log_batch = []
+			self.log_batch_size = 0
+		while len(self.log_pending) > self.jobs * 2:
+			self._xlog_merge_batch()
+
+	def _xlog_merge_batch(self):
+
+		_records, _async = self.log_pending.pop(0)
+		_results, _end_state = _async.get()
+		for _n, (_num_ops, _ptr) in enumerate(_records):
+			_start_state, _events = _results[_n]
+			if self._xlog_get_split_state() == _start_state:
+				for _start_state, _events in _results[_n:]:
+					for _tid, _row in _events:
+						if _row == None:
+							self._xlog_commit(_tid)
+						else:
+							self._xlog_put(_tid, _row)
+				self._xlog_set_split_state(_end_state)
+				return
+			self._xlog_proc_ops(_ptr, _num_ops)
 
 	def _xlog_proc_trans_inode(self, ptr, length, i, num_ops, continued, op_header = None):
 
@@ -1151,26 +1538,26 @@ class XFS:
 		_ptr = ptr[length:]
 		if not continued:
 			if length == sizeof(xfs_inode_log_format):
-				_src_lbuf = copy.deepcopy(New(ptr, xfs_inode_log_format))
+				_src_lbuf = New(ptr, xfs_inode_log_format)
 			elif length == sizeof(xfs_inode_log_format_32):
-				_src_lbuf = copy.deepcopy(New(ptr, xfs_inode_log_format_32))
+				_src_lbuf = New(ptr, xfs_inode_log_format_32)
 			else:
-				_src_lbuf = copy.deepcopy(New(ptr, xfs_inode_log_format))
+				_src_lbuf = New(ptr, xfs_inode_log_format)
 				return _src_lbuf.ilf_size, _i, _ptr
 		else:
-			_src_lbuf = copy.deepcopy(New(ptr, xfs_inode_log_format))
+			_src_lbuf = New(ptr, xfs_inode_log_format)
 			return _src_lbuf.ilf_size, _i, _ptr
 
 		_skip_count = _src_lbuf.ilf_size - 1
 		if _i >= num_ops:
 			return _skip_count, _i, _ptr
 
-		_op_head = copy.deepcopy(New(_ptr, xlog_op_header))
+		_op_head = New(_ptr, xlog_op_header)
 		_ptr = self._xlog_proc_op_header(_ptr, _i, num_ops, _op_head)
 		if (_op_head.oh_flags & XLOG_CONTINUE_TRANS):
 			return _skip_count, _i, _ptr
 
-		_dinode = copy.deepcopy(New(_ptr, xfs_log_dinode))
+		_dinode = New(_ptr, xfs_log_dinode)
 		_mode = _dinode.di_mode & S_IFMT
 		_size = _dinode.di_size
 		self._xlog_proc_trans_inode_core(_dinode, _src_lbuf, _op_head, _i, num_ops)
@@ -1179,7 +1566,7 @@ class XFS:
 		if _src_lbuf.ilf_size == 2:
 			return 0, _i, _ptr
 
-		_op_head = copy.deepcopy(New(_ptr, xlog_op_header))
+		_op_head = New(_ptr, xlog_op_header)
 		if (_src_lbuf.ilf_fields & XFS_ILOG_DFORK):
 			if _i == (num_ops - 1):
 				return _skip_count, _i, _ptr
@@ -1199,11 +1586,11 @@ class XFS:
 				if _mode == S_IFDIR:
 					self._xlog_proc_dir2_btree(_ptr, _size, _src_lbuf,_op_head, _i, num_ops, _dinode, True)
 
-			_ptr = _ptr[cpu_to_be32(_op_head.oh_len):]
+			_ptr = _ptr[_op_head.oh_len:]
 			if _op_head.oh_flags & XLOG_CONTINUE_TRANS:
 				return _skip_count, _i, _ptr
 
-			_op_head = copy.deepcopy(New(_ptr, xlog_op_header))
+			_op_head = New(_ptr, xlog_op_header)
 			_skip_count -= 1
 
 		if (_src_lbuf.ilf_fields & XFS_ILOG_AFORK):
@@ -1217,7 +1604,7 @@ class XFS:
 				self._xlog_proc_attr_blk(_ptr, _size, _src_lbuf, _op_head, _i, num_ops, _dinode)
 			elif ((_src_lbuf.ilf_fields & XFS_ILOG_AFORK) & XFS_ILOG_ABROOT):
 				self._xlog_proc_attr_btree(_ptr, _size, _src_lbuf, _op_head, _i, num_ops, _dinode)
-			_ptr = _ptr[cpu_to_be32(_op_head.oh_len):]
+			_ptr = _ptr[_op_head.oh_len:]
 
 			if _op_head.oh_flags & XLOG_CONTINUE_TRANS:
 				return _skip_count, _i, _ptr
@@ -1229,7 +1616,7 @@ class XFS:
 	def _xlog_proc_trans_buffer(self, ptr, length, i, num_ops):
 
 		_head = None
-		_lbuf = copy.deepcopy(New(ptr, xfs_buf_log_format))
+		_lbuf = New(ptr, xfs_buf_log_format)
 		_i = i
 		_super_block = 0
 		_blkno = _lbuf.blf_blkno
@@ -1255,43 +1642,43 @@ class XFS:
 		while _num > 0:
 			_num -= 1
 			_i += 1
-			_head = copy.deepcopy(New(_ptr, xlog_op_header))
-			_length = cpu_to_be32(_head.oh_len)
+			_head = New(_ptr, xlog_op_header)
+			_length = _head.oh_len
 			_ptr = self._xlog_proc_op_header(_ptr, _i, num_ops, _head)
-			_su = copy.deepcopy(New(_ptr, sig_union))
+			_su = New(_ptr, sig_union)
 			if _super_block:
-				if cpu_to_be32(_head.oh_len) < (4 * 8):
+				if _head.oh_len < (4 * 8):
 					pass
 				else:
 					_super_block = 0
 			elif  cpu_to_be32(_su.sig32) == XFS_AGI_MAGIC:
-				if cpu_to_be32(_head.oh_len) < (xfs_agi.agi_uuid.offset - XFS_AGI_UNLINKED_BUCKETS * sizeof(xfs_agino)):
+				if _head.oh_len < (xfs_agi.agi_uuid.offset - XFS_AGI_UNLINKED_BUCKETS * sizeof(xfs_agino)):
 					pass
 				else:
 					pass
 			elif cpu_to_be32(_su.sig32) == XFS_AGF_MAGIC:
-				if cpu_to_be32(_head.oh_len) < xfs_agf.agf_uuid.offset:
+				if _head.oh_len < xfs_agf.agf_uuid.offset:
 					pass
 				else:
 					pass
 			elif cpu_to_be16(_su.sig16) == XFS_DQUOT_MAGIC:
-				if cpu_to_be32(_head.oh_len) < sizeof(xfs_disk_dquot):
+				if _head.oh_len < sizeof(xfs_disk_dquot):
 					pass
 				else:
 					pass
 			elif cpu_to_be16(_su.sig16) == XFS_DINODE_MAGIC:
 				pass
 			elif cpu_to_be32(_su.sig32) == XFS_DIR2_BLOCK_MAGIC:
-				_dir2_data_hdr = copy.deepcopy(New(_ptr, xfs_dir2_data_hdr))
+				_dir2_data_hdr = New(_ptr, xfs_dir2_data_hdr)
 				self._xlog_proc_xfs_dir2(_ptr[sizeof(xfs_dir2_data_hdr):_length], _dir2_data_hdr, _head, _i, num_ops, XFS_DIR2_BLOCK_MAGIC)
 			elif cpu_to_be32(_su.sig32) == XFS_DIR3_BLOCK_MAGIC:
-				_dir3_data_hdr = copy.deepcopy(New(_ptr, xfs_dir3_data_hdr))
+				_dir3_data_hdr = New(_ptr, xfs_dir3_data_hdr)
 				self._xlog_proc_xfs_dir2(_ptr[sizeof(xfs_dir3_data_hdr):_length], _dir3_data_hdr, _head, _i, num_ops, XFS_DIR3_BLOCK_MAGIC)
 			elif cpu_to_be32(_su.sig32) == XFS_DIR2_DATA_MAGIC:
-				_dir2_data_hdr = copy.deepcopy(New(_ptr, xfs_dir2_data_hdr))
+				_dir2_data_hdr = New(_ptr, xfs_dir2_data_hdr)
 				self._xlog_proc_xfs_dir2(_ptr[sizeof(xfs_dir2_data_hdr):_length], _dir2_data_hdr, _head, _i, num_ops, XFS_DIR2_DATA_MAGIC)
 			elif cpu_to_be32(_su.sig32) == XFS_DIR3_DATA_MAGIC:
-				_dir3_data_hdr = copy.deepcopy(New(_ptr, xfs_dir3_data_hdr))
+				_dir3_data_hdr = New(_ptr, xfs_dir3_data_hdr)
 				self._xlog_proc_xfs_dir2(_ptr[sizeof(xfs_dir3_data_hdr):_length], _dir3_data_hdr, _head, _i, num_ops, XFS_DIR3_DATA_MAGIC)
 
 			_ptr = _ptr[_length:]
@@ -1307,7 +1694,7 @@ class XFS:
 		if length != sizeof(xfs_icreate_log):
 			return 1, i, _ptr
 
-		_icreate_log = copy.deepcopy(New(ptr, xfs_icreate_log))
+		_icreate_log = New(ptr, xfs_icreate_log)
 		_icl_ag = cpu_to_be32(_icreate_log.icl_ag)
 		_icl_agbno = cpu_to_be32(_icreate_log.icl_agbno)
 		_icl_count = cpu_to_be32(_icreate_log.icl_count)
@@ -1321,9 +1708,9 @@ class XFS:
 			if _offset is None:
 				continue
 
-			print("0x%x,%d/%d,XFS_LI_ICREATE,-,0x%x(%d),-,-,-,-,-,-,-,-,-,-,-,-,\"{%sicl_count%s:%s%d/%d%s,%soffset%s:%s0x%x(%d)%s,%sicl_ag%s:%s%d%s,%sicl_agbno%s:%s%d%s,%sicl_gen%s:%s0x%x%s}\"" \
+			self._xlog_put(op_head.oh_tid, "0x%x,%d/%d,XFS_LI_ICREATE,-,0x%x(%d),-,-,-,-,-,-,-,-,-,-,-,-,\"{%sicl_count%s:%s%d/%d%s,%soffset%s:%s0x%x(%d)%s,%sicl_ag%s:%s%d%s,%sicl_agbno%s:%s%d%s,%sicl_gen%s:%s0x%x%s}\"" \
 					% \
-					(cpu_to_be32(op_head.oh_tid),\
+					(op_head.oh_tid,\
 					i,num_ops,\
 					_ino,_ino,\
 					q,q,q,_i,_icl_count,q,\
@@ -1331,13 +1718,13 @@ class XFS:
 					q,q,q,_icl_ag,q,
 					q,q,q,_icl_agbno,q,\
 					q,q,q,_icl_gen,q
-					), file = self.out_fd)
+					))
 
 		return 0, i, _ptr
 
 	def _xlog_proc_trans_inode_core(self, dinode, src_lbuf, op_head, i, num_ops, is_bigendian = False):
 
-		if xfs_dinode_has_bigtime(dinode.di_version, dinode.di_flags2, is_bigendian):
+		if xfs_dinode_has_bigtime(dinode.di_version, dinode.di_flags2):
 			_atime = timestamp_to_str(dinode.di_atime, is_bigendian)
 			_mtime = timestamp_to_str(dinode.di_mtime, is_bigendian)
 			_ctime = timestamp_to_str(dinode.di_ctime, is_bigendian)
@@ -1348,27 +1735,22 @@ class XFS:
 			_ctime = legacy_timestamp_to_str(dinode.di_ctime, is_bigendian)
 			_crtime = legacy_timestamp_to_str(dinode.di_crtime, is_bigendian)
 
-		_data_fork_type_str = conv_type_to_str(get_type(dinode.di_mode, is_bigendian))
+		_data_fork_type_str = conv_type_to_str(get_type(dinode.di_mode))
 		if dinode.di_version != 0x03:
 			_crtime = "-"
 
 		_ino = src_lbuf.ilf_ino
 		if is_bigendian:
-			_ino = cpu_to_be64(dinode.di_ino)
+			_ino = dinode.di_ino
 
 		_mode = dinode.di_mode
 		_uid = dinode.di_uid
 		_gid = dinode.di_gid
 		_size = dinode.di_size
-		if is_bigendian:
-			_mode = cpu_to_be16(dinode.di_mode)
-			_uid = cpu_to_be32(dinode.di_uid)
-			_gid = cpu_to_be32(dinode.di_gid)
-			_size = cpu_to_be64(dinode.di_size)
 
-		print("0x%x,%d/%d,XFS_LI_INODE,XFS_ILOG_CORE,0x%x(%d),-,0o%o,%d,%d,%d,%s,%s,%s,%s,-,%s,-,{}" \
+		self._xlog_put(op_head.oh_tid, "0x%x,%d/%d,XFS_LI_INODE,XFS_ILOG_CORE,0x%x(%d),-,0o%o,%d,%d,%d,%s,%s,%s,%s,-,%s,-,{}" \
 				% \
-				(cpu_to_be32(op_head.oh_tid),\
+				(op_head.oh_tid,\
 				i, num_ops,\
 				_ino,_ino,\
 				_mode,\
@@ -1380,12 +1762,12 @@ class XFS:
 				_ctime,\
 				_crtime,\
 				_data_fork_type_str
-				), file = self.out_fd)
+				))
 
 	def _xlog_proc_dir2_sf(self, ptr, size, src_lbuf, op_head, i, num_ops):
 
 		_namebuf = ""
-		_dir2_sf_hdr = copy.deepcopy(New(ptr, xfs_dir2_sf_hdr))
+		_dir2_sf_hdr = New(ptr, xfs_dir2_sf_hdr)
 		if _dir2_sf_hdr.i8count > 0:
 			_pino = array_to_num(_dir2_sf_hdr.parent.i8)
 			_count = _dir2_sf_hdr.i8count
@@ -1399,23 +1781,23 @@ class XFS:
 			_ino = self._xfs_dir2_sf_get_ino(ptr, _dir2_sf_hdr)
 			if _ino is None:
 				break
-			_dir2_sf_entry = copy.deepcopy(New(ptr, xfs_dir2_sf_entry))
+			_dir2_sf_entry = New(ptr, xfs_dir2_sf_entry)
 			_pos = xfs_dir2_sf_entry.offset.offset + sizeof(xfs_dir2_sf_off)
-			_namebuf = ptr[_pos:(_pos+_dir2_sf_entry.namelen)].decode('utf-8', errors='ignore')
+			_namebuf = bytes(ptr[_pos:(_pos+_dir2_sf_entry.namelen)]).decode('utf-8', errors='ignore')
 			_ftype_str = "-"
 			if xfs_has_ftype(self._m_features):
 				_ftype = ptr[_pos+_dir2_sf_entry.namelen]
 				_ftype_str = xfs_dir3_ft(_ftype).name
 
-			print("0x%x,%d/%d,XFS_LI_INODE,XFS_ILOG_DDATA,0x%x(%d),\"%s\",-,-,-,-,-,-,-,-,%s,-,0x%x(%d),{}" \
+			self._xlog_put(op_head.oh_tid, "0x%x,%d/%d,XFS_LI_INODE,XFS_ILOG_DDATA,0x%x(%d),\"%s\",-,-,-,-,-,-,-,-,%s,-,0x%x(%d),{}" \
 					% \
-					(cpu_to_be32(op_head.oh_tid),\
+					(op_head.oh_tid,\
 					i,num_ops,\
 					_ino,_ino,\
 					_namebuf,\
 					_ftype_str,\
 					_pino,_pino
-					), file = self.out_fd)
+					))
 
 			_pos = self._xfs_dir2_sf_entsize(_dir2_sf_hdr, _dir2_sf_entry.namelen)
 			ptr = ptr[_pos:]
@@ -1423,66 +1805,66 @@ class XFS:
 	def _xlog_proc_dir2_blk(self, ptr, size, src_lbuf,op_head, i, num_ops, dinode):
 
 		_ino = src_lbuf.ilf_ino
-		print("0x%x,%d/%d,XFS_LI_INODE,XFS_ILOG_DEXT,0x%x(%d),\"-\",-,-,-,-,-,-,-,-,-,-,-,\"{%smemo%s:%s_xlog_proc_dir2_blk is not implemented.%s}\"" \
+		self._xlog_put(op_head.oh_tid, "0x%x,%d/%d,XFS_LI_INODE,XFS_ILOG_DEXT,0x%x(%d),\"-\",-,-,-,-,-,-,-,-,-,-,-,\"{%smemo%s:%s_xlog_proc_dir2_blk is not implemented.%s}\"" \
 				% \
-				(cpu_to_be32(op_head.oh_tid),\
+				(op_head.oh_tid,\
 				i,num_ops,\
 				_ino,_ino,\
 				q,q,q,q
-				), file = self.out_fd)
+				))
 
 	def _xlog_proc_dir2_btree(self, ptr, size, src_lbuf,op_head, i, num_ops, dinode, is_root):
 
 		_ino = src_lbuf.ilf_ino
-		print("0x%x,%d/%d,XFS_LI_INODE,XFS_ILOG_DBROOT,0x%x(%d),\"-\",-,-,-,-,-,-,-,-,-,-,-,\"{%smemo%s:%s_xlog_proc_dir2_btree is not implemented.%s}\"" \
+		self._xlog_put(op_head.oh_tid, "0x%x,%d/%d,XFS_LI_INODE,XFS_ILOG_DBROOT,0x%x(%d),\"-\",-,-,-,-,-,-,-,-,-,-,-,\"{%smemo%s:%s_xlog_proc_dir2_btree is not implemented.%s}\"" \
 				% \
-				(cpu_to_be32(op_head.oh_tid),\
+				(op_head.oh_tid,\
 				i,num_ops,\
 				_ino,_ino,\
 				q,q,q,q
-				), file = self.out_fd)
+				))
 
 	def _xlog_proc_sl_sf(self, ptr, size, src_lbuf, op_head, i, num_ops):
 
 		_ino = src_lbuf.ilf_ino
-		print("0x%x,%d/%d,XFS_LI_INODE,XFS_ILOG_DDATA,0x%x(%d),-,-,-,-,-,-,-,-,-,-,-,-,\"{%sdi_symlink%s:%s%s%s}\"" \
+		self._xlog_put(op_head.oh_tid, "0x%x,%d/%d,XFS_LI_INODE,XFS_ILOG_DDATA,0x%x(%d),-,-,-,-,-,-,-,-,-,-,-,-,\"{%sdi_symlink%s:%s%s%s}\"" \
 				% \
-				(cpu_to_be32(op_head.oh_tid),\
+				(op_head.oh_tid,\
 				i,num_ops,\
 				_ino,_ino,\
-				q,q,q,ptr[:size].decode('utf-8'),q
-				), file = self.out_fd)
+				q,q,q,bytes(ptr[:size]).decode('utf-8'),q
+				))
 
 	def _xlog_proc_sl_blk(self, ptr, size, src_lbuf, op_head, i, num_ops, dinode):
 
 		_ino = src_lbuf.ilf_ino
-		print("0x%x,%d/%d,XFS_LI_INODE,XFS_ILOG_DEXT,0x%x(%d),-,-,-,-,-,-,-,-,-,-,-,-,\"{%smemo%s:%s_xlog_proc_sl_blk is not implemented.%s}\"" \
+		self._xlog_put(op_head.oh_tid, "0x%x,%d/%d,XFS_LI_INODE,XFS_ILOG_DEXT,0x%x(%d),-,-,-,-,-,-,-,-,-,-,-,-,\"{%smemo%s:%s_xlog_proc_sl_blk is not implemented.%s}\"" \
 				% \
-				(cpu_to_be32(op_head.oh_tid),\
+				(op_head.oh_tid,\
 				i,num_ops,\
 				_ino,_ino,\
 				q,q,q,q
-				), file = self.out_fd)
+				))
 
 	def _xlog_proc_attr_sf(self, ptr, size, src_lbuf, op_head, i, num_ops):
 
 		_ino = src_lbuf.ilf_ino
-		_attr_sf_hdr = copy.deepcopy(New(ptr, xfs_attr_sf_hdr))
-		_totsize = cpu_to_be16(_attr_sf_hdr.totsize)
+		_attr_sf_hdr = New(ptr, xfs_attr_sf_hdr)
+		_totsize = _attr_sf_hdr.totsize
 		_count = _attr_sf_hdr.count
 		ptr = ptr[sizeof(xfs_attr_sf_hdr):]
 		for _i in range(0, _count, 1):
-			_attr_sf_entry = copy.deepcopy(New(ptr, xfs_attr_sf_entry))
+			_attr_sf_entry = New(ptr, xfs_attr_sf_entry)
 			_namelen = _attr_sf_entry.namelen
 			_valuelen = _attr_sf_entry.valuelen
 			_flags = _attr_sf_entry.flags
 			ptr = ptr[xfs_attr_sf_entry.nameval.offset:]
-			_name = ptr[:_namelen].decode('utf-8', errors='ignore').replace('\x00','')
+			_name = bytes(ptr[:_namelen]).decode('utf-8', errors='ignore').replace('\x00','')
 			ptr = ptr[_namelen:]
 			if len(ptr) < 1:
 				break
 			try:
-				_value = ptr[:_valuelen].decode('utf-8').replace('\x00','').replace('"','""')
+				_value = bytes(ptr[:_valuelen]).decode('utf-8').replace('\x00','').replace('"','""')
 			except:
 				_value = "0x" + ptr[:_valuelen].hex()
 
@@ -1506,39 +1888,39 @@ class XFS:
 					_flags_str = _flags_str + "|"
 				_flags_str = _flags_str + "XFS_ATTR_INCOMPLETE"
 
-			print("0x%x,%d/%d,XFS_LI_INODE,XFS_ILOG_ADATA,0x%x(%d),-,-,-,-,-,-,-,-,-,-,-,-,\"{%sname%s:%s%s%s,%svalue%s:%s%s%s,%sflags%s:%s%s%s}\"" \
+			self._xlog_put(op_head.oh_tid, "0x%x,%d/%d,XFS_LI_INODE,XFS_ILOG_ADATA,0x%x(%d),-,-,-,-,-,-,-,-,-,-,-,-,\"{%sname%s:%s%s%s,%svalue%s:%s%s%s,%sflags%s:%s%s%s}\"" \
 					% \
-					(cpu_to_be32(op_head.oh_tid),\
+					(op_head.oh_tid,\
 					i,num_ops,\
 					_ino,_ino,\
 					q,q,q,_name,q,\
 					q,q,q,_value,q,\
 					q,q,q,_flags_str,q
-					), file = self.out_fd)
+					))
 
 			ptr = ptr[_valuelen:]
 
 	def _xlog_proc_attr_blk(self, ptr, size, src_lbuf, op_head, i, num_ops, dinode):
 
 		_ino = src_lbuf.ilf_ino
-		print("0x%x,%d/%d,XFS_LI_INODE,XFS_ILOG_AEXT,0x%x(%d),\"-\",-,-,-,-,-,-,-,-,-,-,-,\"{%smemo%s:%s_xlog_proc_attr_blk is not implemented.%s}\"" \
+		self._xlog_put(op_head.oh_tid, "0x%x,%d/%d,XFS_LI_INODE,XFS_ILOG_AEXT,0x%x(%d),\"-\",-,-,-,-,-,-,-,-,-,-,-,\"{%smemo%s:%s_xlog_proc_attr_blk is not implemented.%s}\"" \
 				% \
-				(cpu_to_be32(op_head.oh_tid),\
+				(op_head.oh_tid,\
 				i,num_ops,\
 				_ino,_ino,\
 				q,q,q,q
-				), file = self.out_fd)
+				))
 
 	def _xlog_proc_attr_btree(self, ptr, size, src_lbuf, op_head, i, num_ops, dinode):
 
 		_ino = src_lbuf.ilf_ino
-		print("0x%x,%d/%d,XFS_LI_INODE,XFS_ILOG_ABROOT,0x%x(%d),\"-\",-,-,-,-,-,-,-,-,-,-,-,\"{%smemo%s:%s_xlog_proc_attr_btree is not implemented.%s}\"" \
+		self._xlog_put(op_head.oh_tid, "0x%x,%d/%d,XFS_LI_INODE,XFS_ILOG_ABROOT,0x%x(%d),\"-\",-,-,-,-,-,-,-,-,-,-,-,\"{%smemo%s:%s_xlog_proc_attr_btree is not implemented.%s}\"" \
 				% \
-				(cpu_to_be32(op_head.oh_tid),\
+				(op_head.oh_tid,\
 				i,num_ops,\
 				_ino,_ino,\
 				q,q,q,q
-				), file = self.out_fd)
+				))
 
 	def _xlog_proc_xfs_dir2(self, ptr, hdr, op_head, i, num_ops, magic):
 
@@ -1555,7 +1937,7 @@ class XFS:
 		_ptr = ptr
 		_off = 0
 		while len(ptr) > (_off + sizeof(xfs_dir2_data_union)):
-			_dir2_data_union = copy.deepcopy(New(_ptr, xfs_dir2_data_union))
+			_dir2_data_union = New(_ptr, xfs_dir2_data_union)
 			_unused = _dir2_data_union.unused
 			if _unused.freetag == 0xffff:
 				_pos = self._xfs_dir2_data_unused_tag_p(_unused.length) + sizeof(c_int16)
@@ -1564,9 +1946,9 @@ class XFS:
 				continue
 
 			_entry = _dir2_data_union.entry
-			_ino = cpu_to_be64(_entry.inumber)
+			_ino = _entry.inumber
 			_pos = xfs_dir2_data_entry.namelen.offset + sizeof(c_uint8)
-			_namebuf = _ptr[_pos:(_pos + _entry.namelen)].decode('utf-8', errors='ignore')
+			_namebuf = bytes(_ptr[_pos:(_pos + _entry.namelen)]).decode('utf-8', errors='ignore')
 			_pos += _entry.namelen
 			_ftype = 0
 			if xfs_has_ftype(self._m_features):
@@ -1590,28 +1972,26 @@ class XFS:
 			if xfs_has_ftype(self._m_features):
 				_ftype_str = xfs_dir3_ft(_ftype).name
 
-			print("0x%x,%d/%d,XFS_LI_BUF,%s,0x%x(%d),\"%s\",-,-,-,-,-,-,-,-,%s,-,-,{}" \
+			self._xlog_put(op_head.oh_tid, "0x%x,%d/%d,XFS_LI_BUF,%s,0x%x(%d),\"%s\",-,-,-,-,-,-,-,-,%s,-,-,{}" \
 					% \
-					(cpu_to_be32(op_head.oh_tid),\
+					(op_head.oh_tid,\
 					i,num_ops,\
 					_magic_str,\
 					_ino,_ino,\
 					_namebuf,\
 					_ftype_str
-					), file = self.out_fd)
+					))
 
 	def _xfs_log_stat(self):
 
-		_blkbb_log = self.superblocks[0][0].sb_blocklog - BBSHIFT;
-		_logBBsize = XFS_FSB_TO_BB(cpu_to_be32(self.superblocks[0][0].sb_logblocks), _blkbb_log)
-		_logBBstart = XFS_FSB_TO_DADDR(cpu_to_be64(self.superblocks[0][0].sb_logstart), \
-										cpu_to_be32(self.superblocks[0][0].sb_agblocks), \
-										self.superblocks[0][0].sb_agblklog, _blkbb_log)
-		_sectBBsize = BTOBB(BBSIZE)
-		self._blkbb_log = _blkbb_log
-		self._logBBsize = _logBBsize
-		self._logBBstart = _logBBstart
-		self._sectBBsize = _sectBBsize
+		self._blkbb_log = self.geometry.blkbb_log
+		self._logBBsize = self.geometry.log_bb_size
+		self._logBBstart = self.geometry.log_bb_start
+		self._sectBBsize = BTOBB(BBSIZE)
+		self._log_offset = BBTOOFF64(self._logBBstart)
+		self._log_end = self._log_offset + BBTOB(self._logBBsize)
+		if self.log_buf == None:
+			self.log_buf = self.image.view(self._log_offset, BBTOB(self._logBBsize))
 
 	def _set_logstart(self):
 
@@ -1635,11 +2015,9 @@ class XFS:
 
 		_len = 0
 		while True:
-			self.in_fd.seek(self.cur_pos)
-			_t = self.in_fd.read(sizeof(xlog_rec_header))
-			_rec_header = copy.deepcopy(New(_t, xlog_rec_header))
+			_t = self._xlog_read(self.cur_pos, sizeof(xlog_rec_header))
+			_rec_header = New(_t, xlog_rec_header)
 			self.cur_pos += 512
-			self.in_fd.seek(self.cur_pos)
 			_num_ops, _len = self._xlog_proc_rec_head(_rec_header, _len)
 			_blkno += 1
 			if (_zeroed) and (_num_ops != ZEROED_LOG):
@@ -1660,7 +2038,7 @@ class XFS:
 					else:
 						print("* ERROR: header block=%d" % (_blkno - 1), file = sys.stderr)
 			else:
-				if cpu_to_be32(_rec_header.h_version) == 0x2:
+				if _rec_header.h_version == 0x2:
 					_r, _blkno, _xhdrs, _num_hdrs = self._xlog_proc_extended_headers(_len, _blkno, _rec_header, _num_hdrs, _xhdrs)
 					if _r != 0:
 						break
@@ -1693,18 +2071,16 @@ class XFS:
 
 			while True:
 				if (_err != PARTIAL_READ):
-					self.in_fd.seek(self.cur_pos)
-					_ptr = self.in_fd.read(sizeof(xlog_rec_header))
-					_rec_header = copy.deepcopy(New(_ptr, xlog_rec_header))
+					_ptr = self._xlog_read(self.cur_pos, sizeof(xlog_rec_header))
+					_rec_header = New(_ptr, xlog_rec_header)
 					self.cur_pos += 512
-					self.in_fd.seek(self.cur_pos)
 					_num_ops, _len = self._xlog_proc_rec_head(_rec_header, _len)
 					_blkno += 1
 					if (_num_ops == ZEROED_LOG) or (_num_ops == CLEARED_BLKS) or (_num_ops == BAD_HEADER):
 						if _blkno >= _block_end:
 							break
 						continue
-					if cpu_to_be32(_rec_header.h_version) == 2:
+					if _rec_header.h_version == 2:
 						_r, _blkno, _xhdrs, _num_hdrs = self._xlog_proc_extended_headers(_len, _blkno,_rec_header, _num_hdrs, _xhdrs)
 						if _r != 0:
 							break
@@ -1725,54 +2101,240 @@ class XFS:
 
 				_err = NO_ERROR
 
+	def iter_inodes(self):
+
+		if not self.first_inode_number:
+			return
+		for _inode_rec in self._load_inode(self.first_inode_number):
+			if _inode_rec.inode_num >= 0:
+				yield _inode_rec
+
+	def iter_all_inodes(self, ag_no = None):
+
+		for _ag_no, _agi in self.ag_inode_b_plus_tree_info:
+			if (ag_no == None) or (_ag_no == ag_no):
+				yield from self._load_inode_chunks(_ag_no, _agi)
+
+	def _run_workers(self, worker, tasks):
+
+		_tmpdir = tempfile.mkdtemp()
+		_tasks = []
+		for _i, _task in enumerate(tasks):
+			_tasks.append((os.path.join(_tmpdir, "shard%d.csv" % _i), self.input, self.deleted, \
+						self.columns, self.inode_filter, self.cache_size, self.io_threads, self.cache_stats) + _task)
+		try:
+			with multiprocessing.Pool(min(self.jobs, len(_tasks))) as _pool:
+				_shards = _pool.map(worker, _tasks, chunksize = 1)
+			for _shard in _shards:
+				self.out.put_file(_shard)
+		finally:
+			shutil.rmtree(_tmpdir, ignore_errors=True)
+
 	def search_inodes(self):
+
 		self._put_meta_header()
-		self._load_inodes()
+		_split_at = None
+		if self.jobs > 1:
+			_split_at = SUBTREE_SPLIT_DIRS
+		self.split_dirs = []
+		if self.first_inode_number:
+			for _inode_rec in self._load_inode(self.first_inode_number, _split_at):
+				self._put_inode_rec(_inode_rec)
+		self._flush_inode_recs()
+		if len(self.split_dirs) > 0:
+			_roots = []
+			for _o, _inode_core, _inumber in self.split_dirs:
+				_path = ""
+				if self.resolve_paths:
+					_path = self.get_dir_path(_inumber)
+				_roots.append((_o, _inumber, _path))
+			self.split_dirs = []
+			_batches = min(len(_roots), self.jobs * SUBTREE_BATCHES_PER_JOB)
+			_tasks = []
+			for _b in range(_batches):
+				_tasks.append((_roots[_b * len(_roots) // _batches:(_b + 1) * len(_roots) // _batches],))
+			self._run_workers(_subtree_worker, _tasks)
+		if self.cache_stats:
+			print(self.cache.stats(), file=sys.stderr)
+
+	def search_path(self, path):
 
-	def search_logs(self):
-		self._put_journal_header()
-		self._set_logstart()
+		self._put_meta_header()
+		_inode_rec = self._resolve(path)
+		if _inode_rec == None:
+			print("path not found.", file=sys.stderr)
+			sys.exit(-1)
+		if (self.inode_filter == None) or self.inode_filter.match(_inode_rec):
+			self._put_inode_rec(_inode_rec)
+		self._flush_inode_recs()
 
-	def __del__(self):
-		if hasattr(self,"in_fd"):
-			self.in_fd.close()
-		if hasattr(self,"out_fd"):
-			self.out_fd.close()
+	def search_all_inodes(self):
 
-	def __init__(self, args):
+		self._put_meta_header()
+		if (self.jobs <= 1) or (len(self.ag_inode_b_plus_tree_info) <= 1):
+			for _inode_rec in self.iter_all_inodes():
+				self._put_inode_rec(_inode_rec)
+			self._flush_inode_recs()
+			return
 
-		inf = args.input
-		outf = args.output
+		self._run_workers(_inobt_worker, [(_ag_no,) for _ag_no, _agi in self.ag_inode_b_plus_tree_info])
 
-		deleted = False
-		if hasattr(args, "deleted"):
-			deleted = args.deleted
-		trans = False
-		if hasattr(args, "trans"):
-			trans = args.trans
+	def search_logs(self):
 
+		self._put_journal_header()
+		self.split_trans = {}
+		if self.log_trans != None:
+			self.log_trans = {}
+		if (self.jobs <= 1) or self.trans:
+			self._set_logstart()
+			self._xlog_flush_split()
+			self._xlog_flush_trans()
+			return
+		self.log_pool = multiprocessing.Pool(self.jobs, initializer = _log_worker_init, initargs = (self.input,))
 		try:
-			in_fd = open(inf, "rb")
-		except:
-			print("cannot open source dump file.", file=sys.stderr)
-			sys.exit(-1)
+			self._set_logstart()
+			self._xlog_submit_batch()
+			while len(self.log_pending) > 0:
+				self._xlog_merge_batch()
+			self._xlog_flush_split()
+			self._xlog_flush_trans()
+		finally:
+			self.log_pool.close()
+			self.log_pool.join()
+			self.log_pool = None
+			self.log_batch = []
+			self.log_batch_size = 0
+			self.log_pending = []
+
+	def __del__(self):
+		if hasattr(self,"log_buf") and (self.log_buf != None):
+			self.log_buf.release()
+		if hasattr(self,"cache"):
+			self.cache.close()
+		if hasattr(self,"image"):
+			self.image.close()
+		if hasattr(self,"out") and (self.out != None):
+			self.out.close()
+
+	def __init__(self, inf, outf = None, deleted = False, jobs = 1, trans = False, \
+				cache_size = DEFAULT_CACHE_SIZE, cache_stats = False, columns = None, inode_filter = None, \
+				io_threads = 1, group_trans = False):
+
+		if columns == None:
+			columns = META_COLUMNS
+			if not deleted:
+				columns = META_COLUMNS[:-1]
+		for _c in columns:
+			if _c not in META_FORMATTERS:
+				print("unknown column: %s" % _c, file=sys.stderr)
+				sys.exit(-1)
+
 		try:
-			out_fd = open(outf, "w", encoding="utf-8")
+			image = Image(inf, use_mmap = io_threads <= 1)
 		except:
-			print("cannot open target file.", file=sys.stderr)
+			print("cannot open source dump file.", file=sys.stderr)
 			sys.exit(-1)
+		out = None
+		if outf != None:
+			try:
+				out = Writer(outf)
+			except:
+				print("cannot open target file.", file=sys.stderr)
+				sys.exit(-1)
 
 		self.trans = trans
 		self.cur_pos = 0
 		self.oper = 0
-		self.split_list = None
-		self.in_fd = in_fd
-		self.out_fd = out_fd
+		self.split_trans = {}
+		self.log_capture = None
+		self.log_joining = 0
+		self.log_trans = None
+		if group_trans:
+			self.log_trans = {}
+		self.log_events = None
+		self.pending_entries = []
+		self.sf_groups = 0
+		self.split_dirs = []
+		self.log_rows = None
+		self.log_buf = None
+		self.log_cycles = None
+		self.log_pool = None
+		self.log_batch = []
+		self.log_batch_size = 0
+		self.log_pending = []
+		self.dir_names = {}
+		self.dir_paths = {}
+		self.columns = tuple(columns)
+		self.inode_rec_batch = []
+		self.meta_formatters = [META_FORMATTERS[_c] for _c in columns]
+		self.want_sl_target = "sl_target" in columns
+		self.want_attrs = "attrs" in columns
+		self.inode_filter = inode_filter
+		self.resolve_paths = ("path" in columns) \
+			or ((inode_filter != None) and (inode_filter.path_prefix != None))
+		self.image = image
+		self.out = out
+		self.input = inf
 		self.deleted = deleted
+		self.jobs = jobs
+		self.io_threads = io_threads
+		self.cache_stats = cache_stats
+		self.cache_size = cache_size
 
 		self._set_superblocks()
+		self.cache = BlockCache(self.image, self.geometry.blocksize, cache_size, io_threads)
 		self._set_inode_b_plus_tree_info()
 		self._set_inode_range()
-		self.in_fd.seek(0, os.SEEK_END)
-		self.in_f_size = self.in_fd.tell()
-		self.in_fd.seek(0)
+		self.in_f_size = self.image.size
+
+def _worker_xfs(task):
+
+	_output, _input, _deleted, _columns, _inode_filter, _cache_size, _io_threads, _cache_stats = task[:8]
+	return XFS(_input, _output, deleted = _deleted, columns = _columns, inode_filter = _inode_filter, \
+			cache_size = _cache_size, io_threads = _io_threads)
+
+def _finish_worker(xfs, cache_stats):
+
+	xfs._flush_inode_recs()
+	xfs.out.close()
+	if cache_stats:
+		print(xfs.cache.stats(), file=sys.stderr)
+
+def _inobt_worker(task):
+
+	_ag_no, = task[8:]
+	xfs = _worker_xfs(task)
+	for _inode_rec in xfs.iter_all_inodes(_ag_no):
+		xfs._put_inode_rec(_inode_rec)
+	_finish_worker(xfs, task[7])
+	return task[0]
+
+def _subtree_worker(task):
+
+	_roots, = task[8:]
+	xfs = _worker_xfs(task)
+	for _offset, _inumber, _path in _roots:
+		for _inode_rec in xfs._walk_subtree(_offset, _inumber, _path):
+			xfs._put_inode_rec(_inode_rec)
+	_finish_worker(xfs, task[7])
+	return task[0]
+
+_log_xfs = None
+
+def _log_worker_init(inf):
+
+	global _log_xfs
+	_log_xfs = XFS(inf)
+
+def _log_worker(records):
+
+	xfs = _log_xfs
+	xfs.log_events = []
+	xfs.split_trans = {}
+	_results = []
+	for _num_ops, _ptr in records:
+		_state = xfs._xlog_get_split_state()
+		_n = len(xfs.log_events)
+		xfs._xlog_proc_ops(_ptr, _num_ops)
+		_results.append((_state, xfs.log_events[_n:]))
+	return _results, xfs._xlog_get_split_state()
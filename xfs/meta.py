@@ -1,16 +1,76 @@
 from lib.xfs import *
 from argparse import ArgumentParser
+import datetime
+import os
+import multiprocessing
+
+def parse_time(s):
+
+	try:
+		return int(s)
+	except ValueError:
+		pass
+	return int(datetime.datetime.fromisoformat(s).replace(tzinfo=datetime.timezone.utc).timestamp())
 
 def main():
 
+	multiprocessing.freeze_support()
 	parser = ArgumentParser()
 	parser.add_argument("-i", "--input", help="specify disk image", required=True)
 	parser.add_argument("-o", "--output", help="specify output file", required=True)
 	parser.add_argument("-d", "--deleted", help="specify to search deleted objects", action="store_true")
+	parser.add_argument("-a", "--all-inodes", help="specify to enumerate inodes through the inode B+trees of all AGs", action="store_true")
+	parser.add_argument("-j", "--jobs", help="specify number of worker processes (default: 1)", type=int, default=1)
+	parser.add_argument("-c", "--cache-size", help="specify block cache size in MiB (default: 64)", type=int, default=64)
+	parser.add_argument("-s", "--cache-stats", help="show block cache statistics", action="store_true")
+	parser.add_argument("-I", "--io-threads", help="specify number of threads issuing positional reads (default: 1, memory-mapped)", type=int, default=1)
+	parser.add_argument("-l", "--lookup", help="specify a path to output without walking the whole tree")
+	parser.add_argument("-C", "--columns", help="specify comma-separated output columns (default: all)")
+	parser.add_argument("-p", "--path-prefix", help="specify to output only entries under this path")
+	parser.add_argument("-T", "--type", help="specify comma-separated di_mode_ft types to output (e.g. S_IFREG,S_IFDIR)")
+	parser.add_argument("-u", "--uid", help="specify uid to output", type=int)
+	parser.add_argument("--mtime-after", help="specify lower mtime bound (epoch seconds or ISO 8601 UTC)", type=parse_time)
+	parser.add_argument("--mtime-before", help="specify upper mtime bound (epoch seconds or ISO 8601 UTC)", type=parse_time)
+	parser.add_argument("--ctime-after", help="specify lower ctime bound (epoch seconds or ISO 8601 UTC)", type=parse_time)
+	parser.add_argument("--ctime-before", help="specify upper ctime bound (epoch seconds or ISO 8601 UTC)", type=parse_time)
 	args = parser.parse_args()
 
-	xfs = XFS(args)
-	xfs.search_inodes()
+	if args.all_inodes and (args.path_prefix != None):
+		print("-p cannot be used with -a.", file=sys.stderr)
+		sys.exit(-1)
+
+	columns = None
+	if args.columns != None:
+		columns = args.columns.split(",")
+	ftypes = None
+	if args.type != None:
+		ftypes = set(args.type.split(","))
+		_known = set([conv_type_to_str(_i << 12) for _i in range((S_IFMT >> 12) + 1)])
+		for _ftype in sorted(ftypes - _known):
+			parser.error("unknown type %s (choose from %s)" % (_ftype, ",".join(sorted(_known))))
+	uids = None
+	if args.uid != None:
+		uids = set([args.uid])
+	mtime_range = None
+	if (args.mtime_after != None) or (args.mtime_before != None):
+		mtime_range = (args.mtime_after, args.mtime_before)
+	ctime_range = None
+	if (args.ctime_after != None) or (args.ctime_before != None):
+		ctime_range = (args.ctime_after, args.ctime_before)
+	inode_filter = None
+	if (args.path_prefix != None) or (ftypes != None) or (uids != None) \
+		or (mtime_range != None) or (ctime_range != None):
+		inode_filter = InodeFilter(args.path_prefix, ftypes, uids, mtime_range, ctime_range)
+
+	xfs = XFS(args.input, args.output, deleted = args.deleted, jobs = args.jobs, \
+			cache_size = args.cache_size * 1024 * 1024, cache_stats = args.cache_stats, \
+			columns = columns, inode_filter = inode_filter, io_threads = args.io_threads)
+	if args.lookup != None:
+		xfs.search_path(args.lookup)
+	elif args.all_inodes:
+		xfs.search_all_inodes()
+	else:
+		xfs.search_inodes()
 
 if __name__ == '__main__':
 	main()
@@ -0,0 +1,128 @@
+from lib.xfs import *
+from argparse import ArgumentParser
+import multiprocessing
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+import json
+
+def inode_rec_to_dict(xfs, inode_rec):
+
+	_d = {}
+	_d["inode"] = inode_rec.inode_num
+	_d["name"] = inode_rec.name
+	for _k in ["mode", "uid", "gid", "size", "atime", "mtime", "ctime", "crtime"]:
+		_d[_k] = None
+	if inode_rec.has_core:
+		_d["mode"] = "0o%o" % inode_rec.mode
+		_d["uid"] = inode_rec.uid
+		_d["gid"] = inode_rec.gid
+		_d["size"] = inode_rec.size
+		_d["atime"] = raw_timestamp_to_str(inode_rec.atime, inode_rec.bigtime)
+		_d["mtime"] = raw_timestamp_to_str(inode_rec.mtime, inode_rec.bigtime)
+		_d["ctime"] = raw_timestamp_to_str(inode_rec.ctime, inode_rec.bigtime)
+		_d["crtime"] = raw_timestamp_to_str(inode_rec.crtime, inode_rec.bigtime)
+	_d["xfs_dir3_ft"] = META_FORMATTERS["xfs_dir3_ft"](xfs, inode_rec)
+	_d["di_mode_ft"] = META_FORMATTERS["di_mode_ft"](xfs, inode_rec)
+	_d["parent_inode"] = max(inode_rec.parent_inode_num, 0)
+	_d["path"] = inode_rec.parent_path
+	_d["sl_target"] = inode_rec.sl_target
+	_d["attrs"] = inode_rec.attrs
+	_d["is_deleted"] = inode_rec.is_deleted
+	return _d
+
+class XFSRequestHandler(BaseHTTPRequestHandler):
+
+	def _reply(self, code, obj):
+
+		_body = json.dumps(obj).encode("utf-8")
+		self.send_response(code)
+		self.send_header("Content-Type", "application/json")
+		self.send_header("Content-Length", str(len(_body)))
+		self.end_headers()
+		self.wfile.write(_body)
+
+	def _get_inode(self, xfs, params):
+
+		if "ino" in params:
+			_inode_rec = xfs.get_inode(int(params["ino"][0], 0))
+		elif "path" in params:
+			_inode_rec = xfs.lookup(params["path"][0])
+		else:
+			return 400, {"error": "ino or path is required"}
+		if _inode_rec == None:
+			return 404, {"error": "not found"}
+		return 200, inode_rec_to_dict(xfs, _inode_rec)
+
+	def _list_dir(self, xfs, params):
+
+		_path = ""
+		if "ino" in params:
+			_inumber = int(params["ino"][0], 0)
+		elif "path" in params:
+			_inode_rec = xfs.lookup(params["path"][0])
+			if _inode_rec == None:
+				return 404, {"error": "not found"}
+			_inumber = _inode_rec.inode_num
+			_path = join_path(_inode_rec.parent_path, _inode_rec.name)
+		else:
+			return 400, {"error": "ino or path is required"}
+		_inode_recs = xfs.list_dir(_inumber, _path)
+		if _inode_recs == None:
+			return 404, {"error": "not a directory"}
+		return 200, {"inode": _inumber, "path": _path, \
+					"entries": [inode_rec_to_dict(xfs, _r) for _r in _inode_recs]}
+
+	def _get_journal(self, xfs, params):
+
+		_rows = xfs.get_log_rows()
+		_start = int(params.get("start", ["0"])[0])
+		_count = int(params.get("count", [str(len(_rows))])[0])
+		if (_start < 0) or (_count < 0):
+			return 400, {"error": "start and count must not be negative"}
+		return 200, {"header": _rows[0], "total": len(_rows) - 1, "start": _start, \
+					"rows": _rows[1 + _start:1 + _start + _count]}
+
+	def do_GET(self):
+
+		_url = urlparse(self.path)
+		_params = parse_qs(_url.query)
+		_routes = {
+			"/inode": self._get_inode,
+			"/list": self._list_dir,
+			"/journal": self._get_journal,
+		}
+		if _url.path not in _routes:
+			self._reply(404, {"error": "unknown endpoint"})
+			return
+		try:
+			_code, _obj = _routes[_url.path](self.server.xfs, _params)
+		except ValueError as e:
+			_code, _obj = 400, {"error": str(e)}
+		except SystemExit:
+			_code, _obj = 500, {"error": "cannot parse image"}
+		except Exception as e:
+			_code, _obj = 500, {"error": str(e)}
+		self._reply(_code, _obj)
+
+def main():
+
+	multiprocessing.freeze_support()
+	parser = ArgumentParser()
+	parser.add_argument("-i", "--input", help="specify disk image", required=True)
+	parser.add_argument("-b", "--bind", help="specify address to listen on (default: 127.0.0.1)", default="127.0.0.1")
+	parser.add_argument("-p", "--port", help="specify port to listen on (default: 8080)", type=int, default=8080)
+	parser.add_argument("-d", "--deleted", help="specify to search deleted objects", action="store_true")
+	parser.add_argument("-c", "--cache-size", help="specify block cache size in MiB (default: 64)", type=int, default=64)
+	args = parser.parse_args()
+
+	xfs = XFS(args.input, deleted = args.deleted, cache_size = args.cache_size * 1024 * 1024)
+	server = HTTPServer((args.bind, args.port), XFSRequestHandler)
+	server.xfs = xfs
+	try:
+		server.serve_forever()
+	except KeyboardInterrupt:
+		pass
+	server.server_close()
+
+if __name__ == '__main__':
+	main()